@@ -3,28 +3,63 @@ Flaskアプリケーションファクトリ
 
 アプリケーションの初期化と設定を行います
 """
+import os
 from flask import Flask
 from flask_cors import CORS
 from config import Config
+from app.clock import set_clock
+from app.routes import bp
+from app.services.requestLogger import init_logging
+from app.services.profileStore import ProfileStore
+from app.services.scheduleRepository import ScheduleRepository
+from app.services.alertScheduler import init_alerts
+from app.services.startupReport import StartupReport, start_warmup
 
-def create_app(config_class=Config):
+def create_app(config_class=Config, clock=None):
     """
     Flaskアプリケーションを作成
     
+    プロセス開始からこの関数の呼び出しまで（インタープリター起動・モジュール読み込み）を
+    imports フェーズとし、以降の起動時間をフェーズごとに計測します
+    
     Args:
         config_class: 設定クラス
+        clock: 現在時刻を提供する時計（テスト・リプレイ用、指定しない場合はシステム時刻）
         
     Returns:
         Flask: Flaskアプリケーションインスタンス
     """
-    app = Flask(__name__)
-    app.config.from_object(config_class)
+    report = StartupReport()
+    report.record_since_origin('imports')
     
-    # CORS設定
-    CORS(app, origins=app.config['CORS_ORIGINS'])
+    with report.phase('app_factory'):
+        app = Flask(__name__)
+        app.config.from_object(config_class)
+        app.extensions['startup_report'] = report
+        
+        # 時計を差し替え（モデル・サービス・ルートで共通）
+        if clock is not None:
+            set_clock(clock)
+        
+        # CORS設定
+        CORS(app, origins=app.config['CORS_ORIGINS'])
+        
+        # 構造化ログを初期化
+        init_logging(app)
+        
+        # プロファイル・時刻表ファイルの読み込みと時刻表インデックスを共有
+        app.extensions['profile_store'] = ProfileStore(os.path.dirname(app.config['TRAIN_SCHEDULE_PATH']))
+        app.extensions['schedule_repository'] = ScheduleRepository(app.extensions['profile_store'])
+        
+        # 出発アラートを初期化（開始は準備完了後）
+        deferred_tasks = []
+        if init_alerts(app):
+            deferred_tasks.append(app.extensions['alert_scheduler'].start)
+        
+        # ルートを登録
+        app.register_blueprint(bp)
     
-    # ルートを登録
-    from app.routes import bp
-    app.register_blueprint(bp)
+    # データを事前読み込みし、完了後に準備完了とする
+    start_warmup(app, report, deferred_tasks)
     
     return app
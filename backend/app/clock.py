@@ -0,0 +1,74 @@
+"""
+時計
+
+現在時刻の取得を差し替え可能にします。
+モデル・サービス・ルートは datetime.now() ではなく get_clock().now() を使用し、
+テストやリプレイでは FixedClock に差し替えて任意の時刻を再現します
+"""
+from datetime import datetime, timedelta
+
+
+class SystemClock:
+    """システム時刻を返す時計クラス"""
+
+    def now(self) -> datetime:
+        """現在時刻を取得"""
+        return datetime.now()
+
+
+class FixedClock:
+    """
+    固定時刻を返す時計クラス
+
+    set / advance で明示的に時刻を進めます
+    """
+
+    def __init__(self, current_time: datetime):
+        """
+        コンストラクタ
+
+        Args:
+            current_time: 初期時刻
+        """
+        self.current_time = current_time
+
+    def now(self) -> datetime:
+        """設定されている時刻を取得"""
+        return self.current_time
+
+    def set(self, current_time: datetime) -> None:
+        """
+        時刻を設定
+
+        Args:
+            current_time: 設定する時刻
+        """
+        self.current_time = current_time
+
+    def advance(self, **kwargs) -> None:
+        """
+        時刻を進める
+
+        Args:
+            **kwargs: timedelta に渡す引数（minutes=5 など）
+        """
+        self.current_time += timedelta(**kwargs)
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    """現在使用している時計を取得"""
+    return _clock
+
+
+def set_clock(clock) -> None:
+    """
+    使用する時計を差し替え
+
+    Args:
+        clock: now() を持つ時計オブジェクト（Noneの場合はシステム時刻に戻す）
+    """
+    global _clock
+    _clock = clock if clock is not None else SystemClock()
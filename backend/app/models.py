@@ -7,6 +7,7 @@ from dataclasses import dataclass
 from datetime import datetime, time
 from typing import List, Optional
 import json
+from .clock import get_clock
 
 @dataclass
 class Train:
@@ -47,12 +48,13 @@ class TrainSchedule:
     trains: List[Train]
     
     @classmethod
-    def from_json_file(cls, file_path: str) -> 'TrainSchedule':
+    def from_json_file(cls, file_path: str, current_time: Optional[datetime] = None) -> 'TrainSchedule':
         """
         JSONファイルから時刻表を読み込み
         
         Args:
             file_path: JSONファイルのパス
+            current_time: 平日/土休日の判定に使う時刻（指定しない場合は現在時刻を使用）
             
         Returns:
             TrainSchedule: 時刻表オブジェクト
@@ -60,15 +62,16 @@ class TrainSchedule:
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
-        return cls.from_dict(data)
+        return cls.from_dict(data, current_time)
     
     @classmethod
-    def from_dict(cls, data: dict) -> 'TrainSchedule':
+    def from_dict(cls, data: dict, current_time: Optional[datetime] = None) -> 'TrainSchedule':
         """
         辞書データから時刻表を読み込み
         
         Args:
             data: 時刻表データ辞書
+            current_time: 平日/土休日の判定に使う時刻（指定しない場合は現在時刻を使用）
             
         Returns:
             TrainSchedule: 時刻表オブジェクト
@@ -76,7 +79,8 @@ class TrainSchedule:
         # 新しい構造（schedules）に対応
         if 'schedules' in data:
             trains = []
-            current_time = datetime.now()
+            if current_time is None:
+                current_time = get_clock().now()
             is_weekend = current_time.weekday() >= 5  # 土曜日(5)・日曜日(6)
             
             for schedule in data['schedules']:
@@ -87,9 +91,12 @@ class TrainSchedule:
                     for train_data in schedule.get('trains', []):
                         def format_time(time_str: str) -> str:
                             return time_str.split(':')[0].zfill(2) + ':' + time_str.split(':')[1].zfill(2)
-                        train_data['departure_time'] = format_time(train_data['departure_time'])
-                        train_data['arrival_time'] = format_time(train_data['arrival_time'])
-                        trains.append(Train(**train_data))
+                        # 読み込み元の辞書はキャッシュで共有されるため書き換えない
+                        trains.append(Train(**{
+                            **train_data,
+                            'departure_time': format_time(train_data['departure_time']),
+                            'arrival_time': format_time(train_data['arrival_time'])
+                        }))
                     break
             
             return cls(station=data.get('depature', ''), trains=trains)
@@ -3,14 +3,31 @@ APIルート定義
 
 フロントエンドとの通信用APIエンドポイントを定義します
 """
-from flask import Blueprint, jsonify, current_app, request
+from flask import Blueprint, Response, jsonify, current_app, request, stream_with_context
 from datetime import datetime
 import json
-import os
-from .services.trainScheduler import TrainScheduler
+import logging
+import queue
+from .clock import get_clock
+from .services.timeCalculator import TimeCalculator
+from .services.departureTable import build_departure_table
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
+error_logger = logging.getLogger('whattimenexttrain.error')
+
+# 徒歩時間・準備時間の上書き値の上限（分）
+MAX_TRAVEL_MINUTES = 720
+
+def log_request_error():
+    """
+    処理中のリクエストで発生した例外をエラーログに記録する（except 節から呼び出す）
+    """
+    error_logger.exception(
+        f'{request.method} {request.path} の処理に失敗しました',
+        extra={'fields': {'path': request.path}}
+    )
+
 def load_profile(profile_name):
     """
     プロファイルファイルを読み込む
@@ -22,48 +39,151 @@ def load_profile(profile_name):
         dict: プロファイルデータ
     """
     try:
-        profile_path = os.path.join(
-            os.path.dirname(current_app.config['TRAIN_SCHEDULE_PATH']),
-            'profile',
-            f'profile_{profile_name}.json'
-        )
-        with open(profile_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return current_app.extensions['profile_store'].load_profile(profile_name)
     except Exception as e:
         raise Exception(f'プロファイル {profile_name} の読み込みに失敗しました: {str(e)}')
 
-def load_schedule_from_profile(profile_data):
+def load_schedule_index(profile_data, current_time):
     """
-    プロファイルデータから時刻表データを読み込む
+    プロファイルの時刻表インデックスを取得する
+    
+    同じ時刻表ファイルを参照するプロファイル間で共有されます
     
     Args:
         profile_data: プロファイルデータ
+        current_time: 平日/土休日の判定に使う時刻
         
     Returns:
-        dict: 時刻表データ
+        ScheduleIndex: 時刻表インデックス
     """
     try:
-        schedule_path = os.path.join(
-            os.path.dirname(current_app.config['TRAIN_SCHEDULE_PATH']),
-            'schedule',
-            profile_data['schedule_file']
-        )
-        with open(schedule_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return current_app.extensions['schedule_repository'].get_index(profile_data['schedule_file'], current_time)
     except Exception as e:
         raise Exception(f'時刻表ファイル {profile_data["schedule_file"]} の読み込みに失敗しました: {str(e)}')
 
+def parse_travel_overrides():
+    """
+    クエリパラメータから徒歩時間・準備時間の上書き値を取得する
+    
+    クエリパラメータ:
+        walk: 徒歩時間（分）
+        prep: 準備時間（分）
+    
+    Returns:
+        tuple: (徒歩時間, 準備時間)（指定がない場合はNone）
+    """
+    overrides = []
+    for name in ('walk', 'prep'):
+        value = request.args.get(name)
+        if value is None or value == '':
+            overrides.append(None)
+            continue
+        if not value.isdecimal() or int(value) > MAX_TRAVEL_MINUTES:
+            raise ValueError(f'{name} には0〜{MAX_TRAVEL_MINUTES}の整数を指定してください')
+        overrides.append(int(value))
+    return tuple(overrides)
+
+def get_travel_minutes(profile_data, overrides):
+    """
+    徒歩時間・準備時間を決定する（上書き値 → プロファイル → デフォルト値の順）
+    
+    Args:
+        profile_data: プロファイルデータ
+        overrides: parse_travel_overrides の戻り値
+        
+    Returns:
+        tuple: (徒歩時間, 準備時間)
+    """
+    walking_time, preparation_time = overrides
+    if walking_time is None:
+        walking_time = int(profile_data.get('walking_time_minutes', current_app.config['HOME_TO_STATION_MINUTES']))
+    if preparation_time is None:
+        preparation_time = int(profile_data.get('preparation_minutes', current_app.config['PREPARATION_MINUTES']))
+    return walking_time, preparation_time
+
 @bp.route('/health', methods=['GET'])
 def health_check():
     """
     ヘルスチェック用APIエンドポイント
     
+    プロセスが応答していれば常に200を返します（alive）。
+    データの事前読み込みが完了しているかは ready で確認できます
+    
     Returns:
         JSON: サーバー状態
     """
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat()
+        'alive': True,
+        'ready': current_app.extensions['startup_report'].ready,
+        'timestamp': get_clock().now().isoformat()
+    })
+
+@bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """
+    準備完了確認用APIエンドポイント
+    
+    データの事前読み込みが完了するまでは503を返します
+    
+    Returns:
+        JSON: 準備状態
+    """
+    ready = current_app.extensions['startup_report'].ready
+    return jsonify({
+        'status': 'ready' if ready else 'starting',
+        'ready': ready,
+        'timestamp': get_clock().now().isoformat()
+    }), 200 if ready else 503
+
+@bp.route('/startup', methods=['GET'])
+def get_startup_report():
+    """
+    起動時間レポートを取得するAPIエンドポイント
+    
+    Returns:
+        JSON: フェーズごとの所要時間と起動から準備完了までの時間
+    """
+    return jsonify(current_app.extensions['startup_report'].to_dict())
+
+@bp.route('/logs', methods=['GET'])
+def get_logs():
+    """
+    直近のログを取得するAPIエンドポイント
+    
+    クエリパラメータ:
+        limit: 最大件数（デフォルト100）
+        kind: ログ種別（access / error など）
+        level: 指定レベル以上（INFO / WARNING / ERROR など）
+    
+    LOG_API_ENABLED が無効な場合は404を返します。
+    スタックトレースはレスポンスに含めません（ログファイルで確認してください）
+    
+    Returns:
+        JSON: 新しい順のログ一覧
+    """
+    log_buffer = current_app.extensions.get('log_buffer')
+    if log_buffer is None or not current_app.config.get('LOG_API_ENABLED', False):
+        return jsonify({
+            'error': 'ログ機能が無効です'
+        }), 404
+    
+    try:
+        entries = log_buffer.get_entries(
+            limit=request.args.get('limit', 100, type=int),
+            kind=request.args.get('kind'),
+            level=request.args.get('level')
+        )
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+    
+    return jsonify({
+        'entries': [
+            {key: value for key, value in entry.items() if key != 'exception'}
+            for entry in entries
+        ]
     })
 
 @bp.route('/profiles', methods=['GET'])
@@ -75,29 +195,23 @@ def get_profiles():
         JSON: プロファイル一覧
     """
     try:
-        profile_dir = os.path.join(
-            os.path.dirname(current_app.config['TRAIN_SCHEDULE_PATH']),
-            'profile'
-        )
-        
         profiles = []
-        if os.path.exists(profile_dir):
-            for filename in os.listdir(profile_dir):
-                if filename.startswith('profile_') and filename.endswith('.json'):
-                    profile_name = filename[8:-5]  # "profile_" と ".json" を除去
-                    try:
-                        profile_data = load_profile(profile_name)
-                        profiles.append({
-                            'name': profile_name,
-                            'departure': profile_data['depature'],
-                            'destinations': profile_data.get('my_destinations', [])
-                        })
-                    except Exception:
-                        continue
+        for profile_name in current_app.extensions['profile_store'].list_profile_names():
+            try:
+                profile_data = load_profile(profile_name)
+                profiles.append({
+                    'name': profile_name,
+                    'departure': profile_data['depature'],
+                    'destinations': profile_data.get('my_destinations', [])
+                })
+            except Exception:
+                error_logger.warning(f'プロファイル {profile_name} をスキップしました', exc_info=True)
+                continue
         
         return jsonify({'profiles': profiles})
         
     except Exception as e:
+        log_request_error()
         return jsonify({
             'error': f'プロファイル一覧の取得に失敗しました: {str(e)}'
         }), 500
@@ -107,35 +221,33 @@ def get_next_train_by_profile(profile_name):
     """
     プロファイル指定での次の列車情報を取得するAPIエンドポイント
     
+    クエリパラメータ walk / prep で徒歩時間・準備時間を上書きできます
+    
     Args:
         profile_name: プロファイル名
         
     Returns:
         JSON: 次の列車情報
     """
+    try:
+        overrides = parse_travel_overrides()
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+    
     try:
         # プロファイルデータを読み込み
         profile_data = load_profile(profile_name)
-        schedule_data = load_schedule_from_profile(profile_data)
-        
-        # プロファイルから移動時間を取得（デフォルト値も設定）
-        walking_time = int(profile_data.get('walking_time_minutes', current_app.config['HOME_TO_STATION_MINUTES']))
-        preparation_time = int(profile_data.get('preparation_minutes', current_app.config['PREPARATION_MINUTES']))
+        walking_time, preparation_time = get_travel_minutes(profile_data, overrides)
         
-        # 専用のTrainSchedulerインスタンスを作成
-        scheduler = TrainScheduler(
-            schedule_data=schedule_data,
-            home_to_station_minutes=walking_time,
-            preparation_minutes=preparation_time
+        # 共有の時刻表インデックスから検索（上書き値の出発時刻表はキャッシュしない）
+        now = get_clock().now()
+        schedule_index = load_schedule_index(profile_data, now)
+        next_train_info = schedule_index.find_next_train(
+            now, walking_time, preparation_time, cache=overrides == (None, None)
         )
         
-        next_train_info = scheduler.get_next_train_info()
-        
-        if next_train_info is None:
-            return jsonify({
-                'error': '時刻表データの読み込みに失敗しました'
-            }), 500
-        
         # レスポンス用のデータ構造を作成
         response_data = {
             'profile_name': profile_name,
@@ -144,6 +256,8 @@ def get_next_train_by_profile(profile_name):
             'departure_time': next_train_info.departure_time,
             'arrival_time': next_train_info.arrival_time,
             'time_until_departure': next_train_info.time_until_departure,
+            'walking_time_minutes': walking_time,
+            'preparation_minutes': preparation_time,
             'train': None
         }
         
@@ -158,6 +272,7 @@ def get_next_train_by_profile(profile_name):
         return jsonify(response_data)
         
     except Exception as e:
+        log_request_error()
         return jsonify({
             'error': f'エラーが発生しました: {str(e)}'
         }), 500
@@ -176,20 +291,17 @@ def get_trains_by_profile(profile_name):
     try:
         # プロファイルデータを読み込み
         profile_data = load_profile(profile_name)
-        schedule_data = load_schedule_from_profile(profile_data)
-        
-        # プロファイルから移動時間を取得（デフォルト値も設定）
-        walking_time = int(profile_data.get('walking_time_minutes', current_app.config['HOME_TO_STATION_MINUTES']))
-        preparation_time = int(profile_data.get('preparation_minutes', current_app.config['PREPARATION_MINUTES']))
-        
-        # 専用のTrainSchedulerインスタンスを作成
-        scheduler = TrainScheduler(
-            schedule_data=schedule_data,
-            home_to_station_minutes=walking_time,
-            preparation_minutes=preparation_time
-        )
+        schedule_index = load_schedule_index(profile_data, get_clock().now())
         
-        trains = scheduler.get_all_trains()
+        trains = [
+            {
+                'line': train.line,
+                'destination': train.destination,
+                'departure_time': train.departure_time,
+                'arrival_time': train.arrival_time
+            }
+            for train in schedule_index.train_schedule.trains
+        ]
         
         return jsonify({
             'profile_name': profile_name,
@@ -199,6 +311,151 @@ def get_trains_by_profile(profile_name):
         })
         
     except Exception as e:
+        log_request_error()
+        return jsonify({
+            'error': f'エラーが発生しました: {str(e)}'
+        }), 500
+
+@bp.route('/profile/<profile_name>/timetable', methods=['GET'])
+def get_timetable_by_profile(profile_name):
+    """
+    プロファイル指定で運行日1日分の出発時刻表を取得するAPIエンドポイント
+    
+    クライアントはこの時刻表から次の列車をローカルで計算し、
+    expires_at（日付境界）まで再取得する必要はありません。
+    クエリパラメータ walk / prep で徒歩時間・準備時間を上書きできます
+    
+    Args:
+        profile_name: プロファイル名
+        
+    Returns:
+        JSON: 差分エンコードされた出発時刻表
+    """
+    try:
+        overrides = parse_travel_overrides()
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+    
+    try:
+        # プロファイルデータを読み込み
+        profile_data = load_profile(profile_name)
+        walking_time, preparation_time = get_travel_minutes(profile_data, overrides)
+        
+        now = get_clock().now()
+        schedule_index = load_schedule_index(profile_data, now)
+        table = build_departure_table(
+            schedule_index.train_schedule, TimeCalculator(walking_time, preparation_time), now.date()
+        )
+        table['profile_name'] = profile_name
+        table['departure_station'] = profile_data['depature']
+        
+        response = jsonify(table)
+        
+        # 版数トークンをETagとして返し、失効時刻までキャッシュ可能にする
+        response.set_etag(table['version'])
+        expires_at = datetime.fromisoformat(table['expires_at'])
+        response.cache_control.max_age = max(int((expires_at - now).total_seconds()), 0)
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        log_request_error()
         return jsonify({
             'error': f'エラーが発生しました: {str(e)}'
         }), 500
+
+@bp.route('/alerts/upcoming', methods=['GET'])
+def get_upcoming_alerts():
+    """
+    今後の出発アラートを取得するAPIエンドポイント
+    
+    Returns:
+        JSON: 時刻順の通知一覧
+    """
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({'alerts': current_app.extensions['alert_scheduler'].upcoming(limit)})
+
+@bp.route('/alerts/webhooks', methods=['GET'])
+def get_alert_webhooks():
+    """
+    登録済みWebhook一覧を取得するAPIエンドポイント
+    
+    Returns:
+        JSON: Webhook一覧
+    """
+    return jsonify({'webhooks': current_app.extensions['alert_delivery'].list_webhooks()})
+
+@bp.route('/alerts/webhooks', methods=['POST'])
+def register_alert_webhook():
+    """
+    Webhookを登録するAPIエンドポイント
+    
+    リクエストボディ:
+        url: 送信先URL（ローカルのみ）
+        profiles: 通知対象のプロファイル名一覧（省略時は全プロファイル）
+    
+    Returns:
+        JSON: 登録結果
+    """
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict) or not body.get('url'):
+        return jsonify({
+            'error': 'url を指定してください'
+        }), 400
+    
+    try:
+        current_app.extensions['alert_delivery'].register_webhook(body['url'], body.get('profiles'))
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+    
+    return jsonify({'url': body['url'], 'profiles': body.get('profiles')}), 201
+
+@bp.route('/alerts/webhooks', methods=['DELETE'])
+def unregister_alert_webhook():
+    """
+    Webhookの登録を解除するAPIエンドポイント
+    
+    Returns:
+        JSON: 解除結果
+    """
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({
+            'error': 'リクエストボディはJSONオブジェクトで指定してください'
+        }), 400
+    url = body.get('url') or request.args.get('url')
+    if not current_app.extensions['alert_delivery'].unregister_webhook(url):
+        return jsonify({
+            'error': f'Webhook {url} は登録されていません'
+        }), 404
+    return jsonify({'url': url})
+
+@bp.route('/alerts/stream', methods=['GET'])
+def stream_alerts():
+    """
+    出発アラートをServer-Sent Eventsで配信するAPIエンドポイント
+    
+    Returns:
+        Response: text/event-stream
+    """
+    delivery = current_app.extensions['alert_delivery']
+    subscriber = delivery.subscribe()
+    
+    def generate():
+        """通知を待ち受けてイベントとして送出"""
+        try:
+            while True:
+                try:
+                    alert = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # 接続維持用のコメント
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f'event: alert\ndata: {json.dumps(alert, ensure_ascii=False)}\n\n'
+        finally:
+            delivery.unsubscribe(subscriber)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
@@ -0,0 +1,163 @@
+"""
+アラート配信サービス
+
+発火した通知を登録済みのローカルWebhookと
+プッシュストリーム（Server-Sent Events）の購読者に配信します
+"""
+import ipaddress
+import json
+import logging
+import queue
+import socket
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger('whattimenexttrain.alerts')
+
+
+def is_local_url(url: str) -> bool:
+    """
+    URLがローカル（ループバック・プライベートアドレス）を指しているか判定
+
+    Args:
+        url: 判定するURL
+
+    Returns:
+        bool: ローカルの場合True
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        return False
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(parsed.hostname, None)}
+    except socket.gaierror:
+        return False
+    return all(
+        ipaddress.ip_address(address.split('%')[0]).is_loopback
+        or ipaddress.ip_address(address.split('%')[0]).is_private
+        for address in addresses
+    )
+
+
+class AlertDelivery:
+    """
+    アラート配信クラス
+
+    Webhookへの送信はスレッドプールで行い、タイマー処理を待たせません
+    """
+
+    def __init__(self, webhook_timeout_seconds: float = 3, stream_queue_size: int = 100):
+        """
+        コンストラクタ
+
+        Args:
+            webhook_timeout_seconds: Webhook送信のタイムアウト（秒）
+            stream_queue_size: ストリーム購読者ごとの最大滞留件数
+        """
+        self.webhook_timeout_seconds = webhook_timeout_seconds
+        self.stream_queue_size = stream_queue_size
+        self.webhooks: Dict[str, Optional[List[str]]] = {}
+        self.subscribers: List[queue.Queue] = []
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def register_webhook(self, url: str, profiles: Optional[List[str]] = None) -> None:
+        """
+        Webhookを登録
+
+        Args:
+            url: 送信先URL（ローカルのみ）
+            profiles: 通知対象のプロファイル名（Noneの場合は全プロファイル）
+        """
+        if profiles is not None and (
+            not isinstance(profiles, list) or not all(isinstance(name, str) for name in profiles)
+        ):
+            raise ValueError('profiles はプロファイル名（文字列）の配列で指定してください')
+        if not isinstance(url, str) or not is_local_url(url):
+            raise ValueError(f'ローカルのURLのみ登録できます: {url}')
+        with self.lock:
+            self.webhooks[url] = list(profiles) if profiles is not None else None
+
+    def unregister_webhook(self, url: str) -> bool:
+        """
+        Webhookの登録を解除
+
+        Args:
+            url: 送信先URL
+
+        Returns:
+            bool: 登録されていた場合True
+        """
+        with self.lock:
+            return self.webhooks.pop(url, False) is not False
+
+    def list_webhooks(self) -> List[dict]:
+        """登録済みWebhookの一覧を取得"""
+        with self.lock:
+            return [{'url': url, 'profiles': profiles} for url, profiles in self.webhooks.items()]
+
+    def subscribe(self) -> queue.Queue:
+        """
+        プッシュストリームを購読
+
+        Returns:
+            queue.Queue: 通知が届くキュー
+        """
+        subscriber = queue.Queue(maxsize=self.stream_queue_size)
+        with self.lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        """プッシュストリームの購読を解除"""
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def deliver(self, alert: dict) -> None:
+        """
+        通知を配信
+
+        Args:
+            alert: JSONに変換可能な通知データ
+        """
+        with self.lock:
+            subscribers = list(self.subscribers)
+            webhooks = [
+                url for url, profiles in self.webhooks.items()
+                if profiles is None or alert['profile_name'] in profiles
+            ]
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(alert)
+            except queue.Full:
+                # 受信が追いつかない購読者の通知は破棄する
+                pass
+
+        if webhooks and self.executor is None:
+            # Webhookが使われるまでスレッドプールを作らない
+            self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='alert-webhook')
+        for url in webhooks:
+            self.executor.submit(self.post_webhook, url, alert)
+
+    def post_webhook(self, url: str, alert: dict) -> None:
+        """
+        WebhookにJSONをPOST（スレッドプール上で実行）
+
+        Args:
+            url: 送信先URL
+            alert: 通知データ
+        """
+        body = json.dumps(alert, ensure_ascii=False).encode('utf-8')
+        webhook_request = urllib.request.Request(
+            url, data=body, method='POST', headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(webhook_request, timeout=self.webhook_timeout_seconds):
+                pass
+        except Exception as e:
+            logger.warning(f'Webhook送信に失敗しました: {url}: {e}')
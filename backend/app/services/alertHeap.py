@@ -0,0 +1,123 @@
+"""
+アラートタイマーヒープ
+
+全プロファイルの「出発N分前」通知を1つのヒープで管理します。
+ヒープには各プロファイルの直近の通知1件だけを積み、
+発火したら同じプロファイルの次の通知を積み直します
+"""
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class AlertHeap:
+    """
+    共有タイマーヒープクラス
+
+    プロファイルごとの通知予定（時刻順リスト）とその読み出し位置を保持し、
+    ヒープのサイズをプロファイル数に抑えます
+    """
+
+    def __init__(self):
+        """コンストラクタ"""
+        self.heap: List[tuple] = []
+        self.plans: Dict[str, List[dict]] = {}
+        self.cursors: Dict[str, int] = {}
+        self.generations: Dict[str, int] = {}
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+
+    def set_plan(self, profile_name: str, alerts: List[dict]) -> None:
+        """
+        プロファイルの通知予定を置き換え
+
+        以前にヒープへ積んだ通知は世代番号により無効になります
+
+        Args:
+            profile_name: プロファイル名
+            alerts: fire_at（datetime）順に並んだ通知一覧
+        """
+        with self.lock:
+            self.generations[profile_name] = self.generations.get(profile_name, 0) + 1
+            self.plans[profile_name] = alerts
+            self.cursors[profile_name] = 0
+            self.push_next(profile_name)
+
+    def remove_plan(self, profile_name: str) -> None:
+        """
+        プロファイルの通知予定を削除
+
+        Args:
+            profile_name: プロファイル名
+        """
+        with self.lock:
+            self.generations[profile_name] = self.generations.get(profile_name, 0) + 1
+            self.plans.pop(profile_name, None)
+            self.cursors.pop(profile_name, None)
+
+    def push_next(self, profile_name: str) -> None:
+        """プロファイルの次の通知をヒープに積む（ロック取得済みで呼び出す）"""
+        plan = self.plans.get(profile_name, [])
+        cursor = self.cursors.get(profile_name, 0)
+        if cursor < len(plan):
+            heapq.heappush(self.heap, (
+                plan[cursor]['fire_at'], next(self.sequence),
+                profile_name, self.generations[profile_name]
+            ))
+
+    def discard_stale(self) -> None:
+        """先頭の無効な通知を取り除く（ロック取得済みで呼び出す）"""
+        while self.heap and self.heap[0][3] != self.generations.get(self.heap[0][2]):
+            heapq.heappop(self.heap)
+
+    def next_fire_time(self) -> Optional[datetime]:
+        """
+        次に発火する通知の時刻を取得
+
+        Returns:
+            Optional[datetime]: 発火時刻（通知がない場合はNone）
+        """
+        with self.lock:
+            self.discard_stale()
+            return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now: datetime) -> List[dict]:
+        """
+        発火時刻を過ぎた通知をすべて取り出す
+
+        Args:
+            now: 現在時刻
+
+        Returns:
+            List[dict]: 発火すべき通知一覧
+        """
+        due = []
+        with self.lock:
+            self.discard_stale()
+            while self.heap and self.heap[0][0] <= now:
+                _, _, profile_name, _ = heapq.heappop(self.heap)
+                due.append(self.plans[profile_name][self.cursors[profile_name]])
+                self.cursors[profile_name] += 1
+                self.push_next(profile_name)
+                self.discard_stale()
+        return due
+
+    def upcoming(self, limit: int) -> List[dict]:
+        """
+        今後の通知を時刻順に取得
+
+        Args:
+            limit: 最大件数
+
+        Returns:
+            List[dict]: 通知一覧
+        """
+        with self.lock:
+            pending = (
+                alert
+                for profile_name, plan in self.plans.items()
+                for alert in plan[self.cursors[profile_name]:]
+            )
+            return heapq.nsmallest(limit, pending, key=lambda alert: alert['fire_at'])
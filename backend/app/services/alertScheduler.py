@@ -0,0 +1,224 @@
+"""
+出発アラートスケジューラー
+
+各プロファイルの自宅出発時刻から「あとN分で出発」の通知時刻を計算し、
+APSchedulerの単一ジョブと共有タイマーヒープで発火させます
+"""
+import logging
+import os
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Sequence, Tuple
+from ..clock import get_clock
+from .alertDelivery import AlertDelivery
+from .alertHeap import AlertHeap
+from .profileStore import ProfileStore
+from .scheduleIndex import ScheduleIndex
+from .scheduleRepository import ScheduleRepository
+
+logger = logging.getLogger('whattimenexttrain.alerts')
+
+TIMER_JOB_ID = 'alert-timer'
+REFRESH_JOB_ID = 'alert-refresh'
+
+
+def build_alert_plan(profile_name: str, profile_data: dict, index: ScheduleIndex, lead_minutes: Sequence[int],
+                     defaults: Tuple[int, int], now: datetime) -> List[dict]:
+    """
+    プロファイルの当日分の通知予定を作成
+
+    Args:
+        profile_name: プロファイル名
+        profile_data: プロファイルデータ
+        index: 共有の時刻表インデックス（now の曜日に対応するもの）
+        lead_minutes: 出発何分前に通知するか
+        defaults: (徒歩時間, 準備時間) のデフォルト値
+        now: 現在時刻（これ以前の通知は含めない）
+
+    Returns:
+        List[dict]: fire_at 順の通知一覧
+    """
+    total_required_minutes = (
+        int(profile_data.get('walking_time_minutes', defaults[0]))
+        + int(profile_data.get('preparation_minutes', defaults[1]))
+    )
+    leave_minutes, _ = index.get_leave_table(total_required_minutes)
+
+    alerts = []
+    for train, leave in zip(index.train_schedule.trains, leave_minutes):
+        leave_time = time(leave // 60, leave % 60)
+        leave_at = datetime.combine(now.date(), leave_time)
+        for lead in lead_minutes:
+            fire_at = leave_at - timedelta(minutes=lead)
+            if fire_at <= now:
+                continue
+            alerts.append({
+                'fire_at': fire_at,
+                'profile_name': profile_name,
+                'departure_station': profile_data.get('depature', ''),
+                'lead_minutes': lead,
+                'leave_at': leave_time.strftime('%H:%M'),
+                'message': f'あと{lead}分で出発してください',
+                'train': {
+                    'line': train.line,
+                    'destination': train.destination,
+                    'departure_time': train.departure_time,
+                    'arrival_time': train.arrival_time
+                }
+            })
+    alerts.sort(key=lambda alert: alert['fire_at'])
+    return alerts
+
+
+def serialize_alert(alert: dict) -> dict:
+    """通知データをJSONに変換可能な形式にする"""
+    return {**alert, 'fire_at': alert['fire_at'].isoformat()}
+
+
+class AlertScheduler:
+    """
+    出発アラートスケジューラークラス
+
+    定期的にプロファイルの更新を確認し、変更があったプロファイルだけ通知予定を再計算します。
+    時刻表は ScheduleRepository の共有インデックスを使い、プロファイルごとに読み直しません。
+    タイマーはヒープ先頭の時刻に合わせた1つのジョブを張り直して使います
+    """
+
+    def __init__(self, store: ProfileStore, repository: ScheduleRepository, delivery: AlertDelivery,
+                 lead_minutes: Sequence[int], defaults: Tuple[int, int], refresh_seconds: int = 60):
+        """
+        コンストラクタ
+
+        Args:
+            store: プロファイルストア
+            repository: 時刻表リポジトリ
+            delivery: アラート配信サービス
+            lead_minutes: 出発何分前に通知するか
+            defaults: (徒歩時間, 準備時間) のデフォルト値
+            refresh_seconds: プロファイル更新の確認間隔（秒）
+        """
+        self.store = store
+        self.repository = repository
+        self.delivery = delivery
+        self.lead_minutes = lead_minutes
+        self.defaults = defaults
+        self.refresh_seconds = refresh_seconds
+        self.heap = AlertHeap()
+        self.fingerprints: Dict[str, tuple] = {}
+        self.service_date = None
+        self.scheduler = None
+
+    def start(self) -> None:
+        """バックグラウンドでスケジューラーを開始"""
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        self.scheduler = BackgroundScheduler(daemon=True)
+        self.scheduler.start()
+        self.scheduler.add_job(
+            self.refresh, 'interval', seconds=self.refresh_seconds,
+            id=REFRESH_JOB_ID, next_run_time=datetime.now()
+        )
+
+    def shutdown(self) -> None:
+        """スケジューラーを停止"""
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+
+    def refresh(self) -> None:
+        """
+        変更のあったプロファイルの通知予定を再計算
+
+        日付が変わった場合は全プロファイルを再計算します
+        """
+        now = get_clock().now()
+        if self.service_date != now.date():
+            self.service_date = now.date()
+            self.fingerprints.clear()
+
+        names = set(self.store.list_profile_names())
+        for profile_name in set(self.fingerprints) - names:
+            self.fingerprints.pop(profile_name)
+            self.heap.remove_plan(profile_name)
+
+        for profile_name in names:
+            try:
+                fingerprint = self.store.fingerprint(profile_name)
+                if self.fingerprints.get(profile_name) == fingerprint:
+                    continue
+                profile_data = self.store.load_profile(profile_name)
+                index = self.repository.get_index(profile_data['schedule_file'], now)
+                self.heap.set_plan(profile_name, build_alert_plan(
+                    profile_name, profile_data, index, self.lead_minutes, self.defaults, now
+                ))
+                self.fingerprints[profile_name] = fingerprint
+            except Exception:
+                logger.exception(f'プロファイル {profile_name} の通知予定を作成できませんでした')
+                self.heap.remove_plan(profile_name)
+
+        self.arm_timer()
+
+    def fire_due(self) -> None:
+        """発火時刻を過ぎた通知を配信し、次のタイマーを設定"""
+        for alert in self.heap.pop_due(get_clock().now()):
+            self.delivery.deliver(serialize_alert(alert))
+        self.arm_timer()
+
+    def arm_timer(self) -> None:
+        """ヒープ先頭の時刻にタイマージョブを設定"""
+        if self.scheduler is None:
+            return
+        fire_at = self.heap.next_fire_time()
+        if fire_at is None:
+            if self.scheduler.get_job(TIMER_JOB_ID):
+                self.scheduler.remove_job(TIMER_JOB_ID)
+            return
+        self.scheduler.add_job(
+            self.fire_due, 'date', run_date=fire_at,
+            id=TIMER_JOB_ID, replace_existing=True, misfire_grace_time=None
+        )
+
+    def upcoming(self, limit: int = 20) -> List[dict]:
+        """
+        今後の通知を時刻順に取得
+
+        Args:
+            limit: 最大件数
+
+        Returns:
+            List[dict]: JSONに変換可能な通知一覧
+        """
+        return [serialize_alert(alert) for alert in self.heap.upcoming(limit)]
+
+
+def init_alerts(app) -> bool:
+    """
+    出発アラートを初期化
+
+    デバッグ時はリローダーの子プロセスでのみ開始し、スケジューラーの二重起動を防ぎます
+
+    Args:
+        app: Flaskアプリケーション
+
+    Returns:
+        bool: スケジューラーを開始すべき場合True（開始は呼び出し側で行う）
+    """
+    delivery = AlertDelivery(
+        webhook_timeout_seconds=app.config['ALERT_WEBHOOK_TIMEOUT_SECONDS'],
+        stream_queue_size=app.config['ALERT_STREAM_QUEUE_SIZE']
+    )
+    alert_scheduler = AlertScheduler(
+        store=app.extensions['profile_store'],
+        repository=app.extensions['schedule_repository'],
+        delivery=delivery,
+        lead_minutes=app.config['ALERT_LEAD_MINUTES'],
+        defaults=(app.config['HOME_TO_STATION_MINUTES'], app.config['PREPARATION_MINUTES']),
+        refresh_seconds=app.config['ALERT_REFRESH_SECONDS']
+    )
+    app.extensions['alert_delivery'] = delivery
+    app.extensions['alert_scheduler'] = alert_scheduler
+
+    if not app.config.get('ALERTS_ENABLED', False) or app.testing:
+        return False
+    if app.debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return False
+    return True
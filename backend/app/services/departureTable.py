@@ -0,0 +1,87 @@
+"""
+出発時刻表サービス
+
+1日分の自宅出発時刻をクライアント側で計算できる
+コンパクトな形式（差分エンコード）に変換します
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta, date
+from ..models import TrainSchedule
+from .timeCalculator import TimeCalculator
+
+
+def to_minutes(time_str: str) -> int:
+    """
+    HH:MM形式の時刻文字列を0時からの経過分に変換
+
+    Args:
+        time_str: HH:MM形式の時刻
+
+    Returns:
+        int: 0時からの経過分
+    """
+    hour, minute = map(int, time_str.split(':'))
+    return hour * 60 + minute
+
+
+def build_departure_table(train_schedule: TrainSchedule, time_calculator: TimeCalculator, service_date: date) -> dict:
+    """
+    運行日1日分の出発時刻表を作成
+
+    自宅出発時刻（0時からの経過分）を直前の値との差分で並べ、
+    路線名・行き先は重複を除いたテーブルへのインデックスで表現します。
+
+    Args:
+        train_schedule: 列車時刻表
+        time_calculator: 時刻計算サービス
+        service_date: 運行日
+
+    Returns:
+        dict: 出発時刻表データ
+    """
+    lines = []
+    destinations = []
+    leave_deltas = []
+    line_index = []
+    destination_index = []
+    ride_minutes = []
+
+    previous_leave = 0
+    for train in train_schedule.trains:
+        leave_time = time_calculator.calculate_departure_time(train.get_departure_time_obj())
+        leave = leave_time.hour * 60 + leave_time.minute
+        leave_deltas.append(leave - previous_leave)
+        previous_leave = leave
+
+        if train.line not in lines:
+            lines.append(train.line)
+        if train.destination not in destinations:
+            destinations.append(train.destination)
+        line_index.append(lines.index(train.line))
+        destination_index.append(destinations.index(train.destination))
+
+        # 乗車時間（日付をまたぐ場合も正の値にする）
+        ride_minutes.append((to_minutes(train.arrival_time) - to_minutes(train.departure_time)) % 1440)
+
+    table = {
+        'service_date': service_date.isoformat(),
+        'walking_time_minutes': time_calculator.home_to_station_minutes,
+        'preparation_minutes': time_calculator.preparation_minutes,
+        'lines': lines,
+        'destinations': destinations,
+        'leave_deltas': leave_deltas,
+        'line_index': line_index,
+        'destination_index': destination_index,
+        'ride_minutes': ride_minutes
+    }
+
+    # 内容から版数トークンを生成（内容が同じなら同じ値になる）
+    encoded = json.dumps(table, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    table['version'] = hashlib.sha1(encoded).hexdigest()[:16]
+
+    # 平日/土休日の切り替わる日付境界で失効させる
+    expires_at = datetime.combine(service_date + timedelta(days=1), datetime.min.time())
+    table['expires_at'] = expires_at.isoformat()
+
+    return table
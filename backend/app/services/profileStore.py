@@ -0,0 +1,144 @@
+"""
+プロファイルストアサービス
+
+プロファイル・時刻表JSONファイルの読み込みを行います。
+読み込んだ内容はファイルの更新時刻と共にキャッシュし、
+ファイルが更新された場合のみ読み直します
+"""
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger('whattimenexttrain.startup')
+
+
+class ProfileStore:
+    """
+    プロファイルストアクラス
+
+    data/profile と data/schedule 以下のJSONファイルを管理します
+    """
+
+    def __init__(self, data_dir: str, check_updates: bool = True):
+        """
+        コンストラクタ
+
+        Args:
+            data_dir: データディレクトリのパス（profile / schedule を含む）
+            check_updates: 読み込みのたびにファイルの更新を確認するか
+                （一括計算など実行中にファイルが変わらない場合はFalseで確認を省略）
+        """
+        self.profile_dir = os.path.join(data_dir, 'profile')
+        self.schedule_dir = os.path.join(data_dir, 'schedule')
+        self.check_updates = check_updates
+        self.cache: Dict[str, Tuple[float, dict]] = {}
+        self.cache_lock = threading.Lock()
+
+    def load_json(self, path: str) -> dict:
+        """
+        JSONファイルを読み込み（更新時刻が変わっていなければキャッシュを返す）
+
+        Args:
+            path: JSONファイルのパス
+
+        Returns:
+            dict: 読み込んだデータ
+        """
+        with self.cache_lock:
+            cached = self.cache.get(path)
+        if cached is not None and not self.check_updates:
+            return cached[1]
+        mtime = os.path.getmtime(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self.cache_lock:
+            self.cache[path] = (mtime, data)
+        return data
+
+    def profile_path(self, profile_name: str) -> str:
+        """プロファイルファイルのパスを取得"""
+        return os.path.join(self.profile_dir, f'profile_{profile_name}.json')
+
+    def schedule_path(self, schedule_file: str) -> str:
+        """時刻表ファイルのパスを取得"""
+        return os.path.join(self.schedule_dir, schedule_file)
+
+    def list_profile_names(self) -> List[str]:
+        """
+        利用可能なプロファイル名の一覧を取得
+
+        Returns:
+            List[str]: プロファイル名一覧
+        """
+        if not os.path.exists(self.profile_dir):
+            return []
+        return sorted(
+            filename[8:-5]  # "profile_" と ".json" を除去
+            for filename in os.listdir(self.profile_dir)
+            if filename.startswith('profile_') and filename.endswith('.json')
+        )
+
+    def load_profile(self, profile_name: str) -> dict:
+        """
+        プロファイルデータを読み込み
+
+        Args:
+            profile_name: プロファイル名
+
+        Returns:
+            dict: プロファイルデータ
+        """
+        return self.load_json(self.profile_path(profile_name))
+
+    def load_schedule(self, schedule_file: str) -> dict:
+        """
+        時刻表データを読み込み
+
+        Args:
+            schedule_file: 時刻表ファイル名
+
+        Returns:
+            dict: 時刻表データ
+        """
+        return self.load_json(self.schedule_path(schedule_file))
+
+    def warm_up(self) -> Dict[str, str]:
+        """
+        全プロファイルと時刻表を読み込んでキャッシュする
+
+        読み込めないプロファイルがあってもログに記録して残りの読み込みを続けます
+
+        Returns:
+            Dict[str, str]: 読み込みに失敗したプロファイル名とエラー内容
+        """
+        failed = {}
+        for profile_name in self.list_profile_names():
+            try:
+                self.load_schedule(self.load_profile(profile_name)['schedule_file'])
+            except Exception as e:
+                logger.exception(f'プロファイル {profile_name} を読み込めませんでした')
+                failed[profile_name] = f'{type(e).__name__}: {e}'
+        return failed
+
+    def fingerprint(self, profile_name: str) -> Tuple[float, float]:
+        """
+        プロファイルと時刻表ファイルの更新時刻を取得
+
+        どちらかのファイルが更新されると値が変わります
+
+        Args:
+            profile_name: プロファイル名
+
+        Returns:
+            Tuple[float, float]: (プロファイル更新時刻, 時刻表更新時刻)
+        """
+        profile_data = self.load_profile(profile_name)
+        return (
+            os.path.getmtime(self.profile_path(profile_name)),
+            os.path.getmtime(self.schedule_path(profile_data['schedule_file']))
+        )
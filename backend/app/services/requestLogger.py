@@ -0,0 +1,277 @@
+"""
+構造化ログサービス
+
+アクセスログ・エラーログをJSON形式で記録します。
+リクエスト処理スレッドはキューに積むだけで、ファイルへの書き込みは
+バックグラウンドスレッドがまとめて行います（SDカードへのI/O待ちを避けるため）
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, MemoryHandler, RotatingFileHandler
+from typing import List, Optional
+
+LOGGER_NAME = 'whattimenexttrain'
+
+_listener: Optional[QueueListener] = None
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    構造化ログ用のキューハンドラー
+
+    呼び出し元スレッドでログを辞書（entry）に変換してからキューに積みます
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        キューに積む前にログレコードを構造化データに変換
+
+        Args:
+            record: ログレコード
+
+        Returns:
+            logging.LogRecord: entry属性を付与したログレコード
+        """
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'kind': record.name.rsplit('.', 1)[-1] if record.name != LOGGER_NAME else 'app',
+            'message': record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+
+        record.entry = entry
+        record.msg = entry['message']
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    """構造化ログを1行のJSONに整形するフォーマッター"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        ログレコードをJSON文字列に変換
+
+        Args:
+            record: ログレコード
+
+        Returns:
+            str: JSON文字列
+        """
+        return json.dumps(getattr(record, 'entry', {'message': record.getMessage()}), ensure_ascii=False)
+
+
+class BatchFlushHandler(MemoryHandler):
+    """
+    バッチ書き込み用ハンドラー
+
+    件数・ログレベル・経過時間のいずれかの条件を満たした時にまとめて書き込みます
+    """
+
+    def __init__(self, capacity: int, flush_interval_seconds: float, target: logging.Handler):
+        """
+        コンストラクタ
+
+        Args:
+            capacity: まとめて書き込む件数
+            flush_interval_seconds: 書き込み間隔の上限（秒）
+            target: 実際に書き込むハンドラー
+        """
+        super().__init__(capacity, flushLevel=logging.ERROR, target=target, flushOnClose=True)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.last_flush = time.monotonic()
+
+        # ログが途絶えてもバッファに残り続けないよう定期的に書き出す
+        self.stopped = threading.Event()
+        self.flush_thread = threading.Thread(target=self.flush_periodically, daemon=True)
+        self.flush_thread.start()
+
+    def flush_periodically(self) -> None:
+        """一定間隔でバッファを書き出す（バックグラウンドスレッド）"""
+        while not self.stopped.wait(self.flush_interval_seconds):
+            if self.buffer:
+                self.flush()
+
+    def shouldFlush(self, record: logging.LogRecord) -> bool:
+        """書き込み条件を満たしているか判定"""
+        return (super().shouldFlush(record)
+                or time.monotonic() - self.last_flush >= self.flush_interval_seconds)
+
+    def flush(self) -> None:
+        """バッファの内容を書き込み"""
+        super().flush()
+        self.last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """定期書き出しを停止してバッファを書き出す"""
+        self.stopped.set()
+        super().close()
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    直近のログを保持するリングバッファ
+
+    一定件数を超えると古いものから破棄します
+    """
+
+    def __init__(self, size: int):
+        """
+        コンストラクタ
+
+        Args:
+            size: 保持する最大件数
+        """
+        super().__init__()
+        self.entries = deque(maxlen=size)
+        self.entries_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """ログをバッファに追加"""
+        with self.entries_lock:
+            self.entries.append(getattr(record, 'entry', {'message': record.getMessage()}))
+
+    def get_entries(self, limit: int = 100, kind: Optional[str] = None, level: Optional[str] = None) -> List[dict]:
+        """
+        直近のログを取得
+
+        Args:
+            limit: 最大件数
+            kind: ログ種別（access / error など）で絞り込み
+            level: 指定レベル以上で絞り込み
+
+        Returns:
+            List[dict]: 新しい順のログ一覧
+        """
+        if limit < 1:
+            raise ValueError(f'limit は1以上を指定してください: {limit}')
+        min_level = logging.getLevelName(level.upper()) if level else logging.NOTSET
+        if not isinstance(min_level, int):
+            raise ValueError(f'無効なログレベルです: {level}')
+
+        with self.entries_lock:
+            entries = list(self.entries)
+
+        result = []
+        for entry in reversed(entries):
+            if kind and entry.get('kind') != kind:
+                continue
+            if logging.getLevelName(entry.get('level', 'NOTSET')) < min_level:
+                continue
+            result.append(entry)
+            if len(result) >= limit:
+                break
+        return result
+
+
+def init_logging(app) -> None:
+    """
+    構造化ログを初期化
+
+    キュー → バックグラウンドスレッド → (バッチ書き込み + リングバッファ) の
+    構成でロガーを設定し、アクセスログ用のフックを登録します
+
+    Args:
+        app: Flaskアプリケーション
+    """
+    global _listener
+
+    if not app.config.get('LOGGING_ENABLED', False):
+        return
+
+    # 再初期化時は以前のリスナーを停止
+    shutdown_logging()
+
+    log_dir = app.config['LOG_DIR']
+    os.makedirs(log_dir, exist_ok=True)
+
+    file_handler = RotatingFileHandler(
+        os.path.join(log_dir, 'app.log'),
+        maxBytes=app.config['LOG_FILE_MAX_BYTES'],
+        backupCount=app.config['LOG_FILE_BACKUP_COUNT'],
+        encoding='utf-8',
+        delay=True
+    )
+    file_handler.setFormatter(JsonLineFormatter())
+    batch_handler = BatchFlushHandler(
+        capacity=app.config['LOG_BATCH_SIZE'],
+        flush_interval_seconds=app.config['LOG_FLUSH_INTERVAL_SECONDS'],
+        target=file_handler
+    )
+    ring_buffer = RingBufferHandler(app.config['LOG_RING_BUFFER_SIZE'])
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, batch_handler, ring_buffer)
+    _listener.start()
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(StructuredQueueHandler(log_queue))
+
+    app.extensions['log_buffer'] = ring_buffer
+    register_access_log(app)
+
+
+def register_access_log(app) -> None:
+    """
+    アクセスログ記録用のリクエストフックを登録
+
+    Args:
+        app: Flaskアプリケーション
+    """
+    from flask import g, request
+
+    access_logger = logging.getLogger(f'{LOGGER_NAME}.access')
+
+    @app.before_request
+    def start_timer():
+        """リクエスト処理の開始時刻を記録"""
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def write_access_log(response):
+        """処理時間とステータスをアクセスログに記録"""
+        started = g.pop('request_started', None)
+        duration_ms = (time.perf_counter() - started) * 1000 if started is not None else None
+        access_logger.info(f'{request.method} {request.path} {response.status_code}', extra={'fields': {
+            'method': request.method,
+            'path': request.path,
+            'query': request.query_string.decode('utf-8', 'replace'),
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 3) if duration_ms is not None else None,
+            'remote_addr': request.remote_addr
+        }})
+        return response
+
+
+@atexit.register
+def shutdown_logging() -> None:
+    """バックグラウンドスレッドを停止し、キューに残ったログを書き出す"""
+    global _listener
+
+    if _listener is None:
+        return
+
+    _listener.stop()
+    for handler in _listener.handlers:
+        target = getattr(handler, 'target', None)
+        handler.close()
+        if target is not None:
+            target.close()
+    _listener = None
@@ -0,0 +1,106 @@
+"""
+時刻表インデックスサービス
+
+時刻表を分単位の整数配列に変換しておき、次の列車を二分探索で検索します。
+結果は TimeCalculator.find_next_train と同一になります
+"""
+from bisect import bisect_right
+from datetime import datetime, time
+from typing import Dict, List, Tuple
+from ..models import TrainSchedule, NextTrainInfo
+
+MINUTES_PER_DAY = 24 * 60
+MICROSECONDS_PER_MINUTE = 60 * 1000000
+
+
+class ScheduleIndex:
+    """
+    時刻表インデックスクラス
+
+    移動時間・準備時間の合計ごとに自宅出発時刻の配列を作成してキャッシュします。
+    キャッシュするのはプロファイルの設定値のみで、クエリによる上書き値は都度計算します
+    """
+
+    def __init__(self, train_schedule: TrainSchedule):
+        """
+        コンストラクタ
+
+        Args:
+            train_schedule: 列車時刻表
+        """
+        self.train_schedule = train_schedule
+        self.departure_minutes = [
+            train.get_departure_time_obj().hour * 60 + train.get_departure_time_obj().minute
+            for train in train_schedule.trains
+        ]
+        self.leave_tables: Dict[int, Tuple[List[int], List[int]]] = {}
+
+    def get_leave_table(self, total_required_minutes: int, cache: bool = True) -> Tuple[List[int], List[int]]:
+        """
+        自宅出発時刻の配列を取得
+
+        時刻表の並び順のまま「ここまでの最大値」を持つ配列を作ることで、
+        並び順が時刻順でない場合や日付をまたぐ場合も先頭からの線形検索と同じ結果を二分探索で得られます
+
+        Args:
+            total_required_minutes: 移動時間と準備時間の合計（分）
+            cache: 作成した配列をキャッシュするか（任意の上書き値でキャッシュが増え続けないようにする）
+
+        Returns:
+            Tuple[List[int], List[int]]: (自宅出発時刻[分], 先頭からの最大値[マイクロ秒])
+        """
+        table = self.leave_tables.get(total_required_minutes)
+        if table is None:
+            leave_minutes = [(minutes - total_required_minutes) % MINUTES_PER_DAY for minutes in self.departure_minutes]
+            running_max = []
+            current_max = -1
+            for minutes in leave_minutes:
+                current_max = max(current_max, minutes * MICROSECONDS_PER_MINUTE)
+                running_max.append(current_max)
+            table = (leave_minutes, running_max)
+            if cache:
+                self.leave_tables[total_required_minutes] = table
+        return table
+
+    def find_next_train(self, current_time: datetime, home_to_station_minutes: int, preparation_minutes: int,
+                        cache: bool = True) -> NextTrainInfo:
+        """
+        次に乗車できる列車を検索
+
+        Args:
+            current_time: 現在時刻
+            home_to_station_minutes: 自宅から駅までの時間（分）
+            preparation_minutes: 準備時間（分）
+            cache: 自宅出発時刻の配列をキャッシュするか（プロファイルの設定値の場合のみTrue）
+
+        Returns:
+            NextTrainInfo: 次の列車情報
+        """
+        leave_minutes, running_max = self.get_leave_table(home_to_station_minutes + preparation_minutes, cache)
+        now_microseconds = (
+            ((current_time.hour * 60 + current_time.minute) * 60 + current_time.second) * 1000000
+            + current_time.microsecond
+        )
+
+        index = bisect_right(running_max, now_microseconds)
+        if index >= len(leave_minutes):
+            # 今日の列車がない場合
+            return NextTrainInfo(
+                current_time=current_time.strftime('%H:%M'),
+                departure_time="--:--",
+                arrival_time="--:--",
+                train=None,
+                time_until_departure=0
+            )
+
+        leave = leave_minutes[index]
+        arrival = (leave + home_to_station_minutes) % MINUTES_PER_DAY
+        departure_time = time(leave // 60, leave % 60)
+        departure_datetime = datetime.combine(current_time.date(), departure_time)
+        return NextTrainInfo(
+            current_time=current_time.strftime('%H:%M'),
+            departure_time=departure_time.strftime('%H:%M'),
+            arrival_time=time(arrival // 60, arrival % 60).strftime('%H:%M'),
+            train=self.train_schedule.trains[index],
+            time_until_departure=int((departure_datetime - current_time).total_seconds() / 60)
+        )
@@ -0,0 +1,83 @@
+"""
+時刻表リポジトリサービス
+
+時刻表ファイルごとに1つの ScheduleIndex を作成し、同じ時刻表を参照する
+全プロファイル・全リクエストで共有します。
+徒歩時間・準備時間はインデックスに含めず、検索時に指定します
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Tuple
+from ..models import TrainSchedule
+from .profileStore import ProfileStore
+from .scheduleIndex import ScheduleIndex
+
+logger = logging.getLogger('whattimenexttrain.startup')
+
+
+class ScheduleRepository:
+    """
+    時刻表リポジトリクラス
+
+    (時刻表ファイル, 平日/土休日) ごとにインデックスをキャッシュし、
+    ファイルが更新された場合のみ作り直します
+    """
+
+    def __init__(self, store: ProfileStore):
+        """
+        コンストラクタ
+
+        Args:
+            store: プロファイルストア
+        """
+        self.store = store
+        self.indexes: Dict[Tuple[str, bool], Tuple[dict, ScheduleIndex]] = {}
+        self.lock = threading.Lock()
+
+    def get_index(self, schedule_file: str, current_time: datetime) -> ScheduleIndex:
+        """
+        時刻の曜日に対応する時刻表インデックスを取得
+
+        Args:
+            schedule_file: 時刻表ファイル名
+            current_time: 平日/土休日の判定に使う時刻
+
+        Returns:
+            ScheduleIndex: 共有の時刻表インデックス
+        """
+        # ストアはファイルが更新されない限り同じ辞書を返すため、同一性で更新を判定する
+        schedule_data = self.store.load_schedule(schedule_file)
+        key = (schedule_file, current_time.weekday() >= 5)
+        with self.lock:
+            cached = self.indexes.get(key)
+        if cached is not None and cached[0] is schedule_data:
+            return cached[1]
+
+        index = ScheduleIndex(TrainSchedule.from_dict(schedule_data, current_time))
+        with self.lock:
+            self.indexes[key] = (schedule_data, index)
+        return index
+
+    def warm_up(self, current_time: datetime) -> Dict[str, str]:
+        """
+        全プロファイルの時刻表を読み込み、インデックスを作成する
+
+        読み込めないプロファイルがあってもログに記録して残りの読み込みを続けます
+
+        Args:
+            current_time: 平日/土休日の判定に使う時刻
+
+        Returns:
+            Dict[str, str]: 読み込みに失敗したプロファイル名とエラー内容
+        """
+        failed = self.store.warm_up()
+        for profile_name in self.store.list_profile_names():
+            if profile_name in failed:
+                continue
+            try:
+                self.get_index(self.store.load_profile(profile_name)['schedule_file'], current_time)
+            except Exception as e:
+                logger.exception(f'プロファイル {profile_name} の時刻表インデックスを作成できませんでした')
+                failed[profile_name] = f'{type(e).__name__}: {e}'
+        return failed
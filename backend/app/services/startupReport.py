@@ -0,0 +1,162 @@
+"""
+起動時間レポート
+
+起動処理をフェーズ（インポート・アプリケーション作成・データ読み込み）ごとに計測し、
+プロセス開始から準備完了までの時間を記録します
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from ..clock import get_clock
+
+logger = logging.getLogger('whattimenexttrain.startup')
+
+
+def get_process_started() -> float:
+    """
+    プロセスの開始時刻を time.perf_counter 基準で取得
+
+    Linuxでは /proc からプロセス開始時刻を求め、インタープリター起動とモジュール読み込みを含めます。
+    取得できない環境では呼び出し時刻を返します
+
+    Returns:
+        float: プロセス開始時刻（time.perf_counter の値）
+    """
+    now = time.perf_counter()
+    try:
+        with open('/proc/self/stat', 'r') as f:
+            # プロセス名に空白や括弧を含む場合があるため、最後の ")" 以降を分割する（22番目が開始時刻）
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime', 'r') as f:
+            uptime = float(f.read().split()[0])
+        elapsed = uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return now
+    return now - max(elapsed, 0.0)
+
+
+# 起動時間の起点（プロセス開始時刻）
+PROCESS_STARTED = get_process_started()
+
+
+class StartupReport:
+    """
+    起動時間レポートクラス
+
+    フェーズごとの所要時間と準備完了（ready）状態を管理します
+    """
+
+    def __init__(self, origin: float = PROCESS_STARTED):
+        """
+        コンストラクタ
+
+        Args:
+            origin: 起動時間の起点（time.perf_counter の値、デフォルトはプロセス開始時刻）
+        """
+        self.origin = origin
+        self.phases: Dict[str, float] = {}
+        self.ready_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.failed_profiles: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        フェーズの所要時間を計測
+
+        Args:
+            name: フェーズ名
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def record_since_origin(self, name: str) -> None:
+        """
+        起点から現在までを1つのフェーズとして記録
+
+        Args:
+            name: フェーズ名
+        """
+        with self.lock:
+            self.phases[name] = time.perf_counter() - self.origin
+
+    def mark_ready(self, error: Optional[str] = None, failed_profiles: Optional[Dict[str, str]] = None) -> None:
+        """
+        準備完了を記録し、レポートをログに出力
+
+        Args:
+            error: 準備中に発生したエラー（準備自体は完了扱いにする）
+            failed_profiles: 読み込みに失敗したプロファイル名とエラー内容
+        """
+        with self.lock:
+            self.ready_at = time.perf_counter()
+            self.error = error
+            self.failed_profiles = dict(failed_profiles or {})
+        report = self.to_dict()
+        logger.info(f"起動完了: {report['boot_to_ready_ms']}ms", extra={'fields': report})
+
+    @property
+    def ready(self) -> bool:
+        """準備完了しているか"""
+        return self.ready_at is not None
+
+    def to_dict(self) -> dict:
+        """
+        レポートを辞書形式で取得
+
+        Returns:
+            dict: フェーズごとの所要時間（ミリ秒）、起動から準備完了までの時間、読み込みに失敗したプロファイル
+        """
+        with self.lock:
+            return {
+                'ready': self.ready_at is not None,
+                'phases_ms': {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+                'boot_to_ready_ms': round((self.ready_at - self.origin) * 1000, 3) if self.ready_at is not None else None,
+                'uptime_ms': round((time.perf_counter() - self.origin) * 1000, 3),
+                'error': self.error,
+                'failed_profiles': dict(self.failed_profiles)
+            }
+
+
+def start_warmup(app, report: StartupReport, deferred_tasks=()) -> None:
+    """
+    データの事前読み込みを開始
+
+    WARMUP_ON_STARTUP が有効な場合はバックグラウンドで全プロファイル・時刻表を読み込んでインデックスを作成し、
+    完了後に準備完了とします（読み込めなかったプロファイルはレポートに記録します）。その後、準備完了に必須でない処理（deferred_tasks）を実行します
+
+    Args:
+        app: Flaskアプリケーション
+        report: 起動時間レポート
+        deferred_tasks: 準備完了後に実行する関数の一覧
+    """
+    def warm_up():
+        """事前読み込みと後回しにした処理を実行"""
+        error = None
+        failed_profiles = {}
+        if app.config.get('WARMUP_ON_STARTUP', False):
+            try:
+                with report.phase('data_load'):
+                    failed_profiles = app.extensions['schedule_repository'].warm_up(get_clock().now())
+            except Exception as e:
+                logger.exception('データの事前読み込みに失敗しました')
+                error = str(e)
+        report.mark_ready(error, failed_profiles)
+
+        with report.phase('deferred'):
+            for task in deferred_tasks:
+                try:
+                    task()
+                except Exception:
+                    logger.exception('起動後処理に失敗しました')
+
+    threading.Thread(target=warm_up, name='startup-warmup', daemon=True).start()
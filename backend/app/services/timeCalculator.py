@@ -5,6 +5,7 @@
 """
 from datetime import datetime, time, timedelta
 from typing import Optional
+from ..clock import get_clock
 from ..models import Train, TrainSchedule, NextTrainInfo
 
 class TimeCalculator:
@@ -38,7 +39,7 @@ class TimeCalculator:
             time: 自宅を出発すべき時刻
         """
         # datetime オブジェクトを作成して計算
-        base_datetime = datetime.combine(datetime.today(), train_departure_time)
+        base_datetime = datetime.combine(get_clock().now().date(), train_departure_time)
         departure_datetime = base_datetime - timedelta(minutes=self.total_required_minutes)
         return departure_datetime.time()
     
@@ -52,7 +53,7 @@ class TimeCalculator:
         Returns:
             time: 駅到着時刻
         """
-        base_datetime = datetime.combine(datetime.today(), departure_time)
+        base_datetime = datetime.combine(get_clock().now().date(), departure_time)
         arrival_datetime = base_datetime + timedelta(minutes=self.home_to_station_minutes)
         return arrival_datetime.time()
     
@@ -68,7 +69,7 @@ class TimeCalculator:
             NextTrainInfo: 次の列車情報
         """
         if current_time is None:
-            current_time = datetime.now()
+            current_time = get_clock().now()
         
         current_time_obj = current_time.time()
         
@@ -82,7 +83,7 @@ class TimeCalculator:
                 station_arrival_time = self.calculate_arrival_time(departure_time)
                 
                 # 出発まであと何分かを計算
-                departure_datetime = datetime.combine(datetime.today(), departure_time)
+                departure_datetime = datetime.combine(current_time.date(), departure_time)
                 time_until_departure = int((departure_datetime - current_time).total_seconds() / 60)
                 
                 return NextTrainInfo(
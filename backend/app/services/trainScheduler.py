@@ -3,11 +3,14 @@
 
 列車時刻表の管理と次の列車検索を行います
 """
+import logging
 from typing import Optional
 from datetime import datetime
 from ..models import TrainSchedule, NextTrainInfo
 from .timeCalculator import TimeCalculator
 
+logger = logging.getLogger('whattimenexttrain.scheduler')
+
 class TrainScheduler:
     """
     列車スケジューラークラス
@@ -15,7 +18,7 @@ class TrainScheduler:
     時刻表データの管理と次の列車情報の提供を行います
     """
     
-    def __init__(self, schedule_file_path: str = None, schedule_data: dict = None, home_to_station_minutes: int = 0, preparation_minutes: int = 0):
+    def __init__(self, schedule_file_path: str = None, schedule_data: dict = None, home_to_station_minutes: int = 0, preparation_minutes: int = 0, current_time: Optional[datetime] = None):
         """
         コンストラクタ
         
@@ -24,30 +27,34 @@ class TrainScheduler:
             schedule_data: 時刻表データ辞書（オプショナル）
             home_to_station_minutes: 自宅から駅までの時間（分）
             preparation_minutes: 準備時間（分）
+            current_time: 平日/土休日の判定に使う時刻（指定しない場合は現在時刻を使用）
         """
         self.schedule_file_path = schedule_file_path
         self.schedule_data = schedule_data
         self.train_schedule: Optional[TrainSchedule] = None
         self.time_calculator = TimeCalculator(home_to_station_minutes, preparation_minutes)
-        self.load_schedule()
+        self.load_schedule(current_time)
     
-    def load_schedule(self) -> None:
+    def load_schedule(self, current_time: Optional[datetime] = None) -> None:
         """
         時刻表データを読み込み
         
         JSONファイルまたは辞書データから時刻表データを読み込みます
+        
+        Args:
+            current_time: 平日/土休日の判定に使う時刻（指定しない場合は現在時刻を使用）
         """
         try:
             if self.schedule_data is not None:
                 # 辞書データから読み込み
-                self.train_schedule = TrainSchedule.from_dict(self.schedule_data)
+                self.train_schedule = TrainSchedule.from_dict(self.schedule_data, current_time)
             elif self.schedule_file_path is not None:
                 # JSONファイルから読み込み
-                self.train_schedule = TrainSchedule.from_json_file(self.schedule_file_path)
+                self.train_schedule = TrainSchedule.from_json_file(self.schedule_file_path, current_time)
             else:
                 raise ValueError("schedule_file_path または schedule_data のいずれかが必要です")
         except Exception as e:
-            print(f"時刻表の読み込みエラー: {e}")
+            logger.error(f"時刻表の読み込みエラー: {e}", exc_info=True)
             self.train_schedule = None
     
     def reload_schedule(self) -> None:
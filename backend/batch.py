@@ -0,0 +1,300 @@
+"""
+次の列車の一括計算ツール
+
+(プロファイル, 時刻) の組をCSVまたはJSON Linesで読み込み、
+各行の次の列車情報を同じ形式で書き出します。
+入力は一定行数ずつ読み進めるためメモリ使用量は入力サイズに依存せず、
+時刻表は ScheduleRepository で (時刻表ファイル, 平日/土休日) ごとに1度だけインデックス化して使い回します
+
+使用例:
+    python batch.py requests.csv -o results.csv
+    python batch.py requests.jsonl --workers 4 > results.jsonl
+    cat requests.csv | python batch.py - --format csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+from app.services.profileStore import ProfileStore
+from app.services.scheduleRepository import ScheduleRepository
+
+OUTPUT_FIELDS = [
+    'profile', 'timestamp', 'current_time', 'departure_time', 'arrival_time', 'time_until_departure',
+    'line', 'destination', 'train_departure_time', 'train_arrival_time', 'error'
+]
+
+# 読み込めなかった入力行に付けるエラー内容のキー
+INVALID_ROW_KEY = '_error'
+
+
+class BatchEvaluator:
+    """
+    一括計算クラス
+
+    プロファイルをキャッシュし、時刻表インデックスはリポジトリで共有して行ごとの再読み込みを避けます
+    """
+
+    def __init__(self, data_dir: str, defaults: Tuple[int, int]):
+        """
+        コンストラクタ
+
+        Args:
+            data_dir: データディレクトリのパス
+            defaults: (徒歩時間, 準備時間) のデフォルト値
+        """
+        # 実行中は入力ファイルが変わらないため、行ごとの更新確認を省略する
+        self.store = ProfileStore(data_dir, check_updates=False)
+        self.repository = ScheduleRepository(self.store)
+        self.defaults = defaults
+        self.profiles: Dict[str, Tuple[str, int, int]] = {}
+
+    def get_profile(self, profile_name: str) -> Tuple[str, int, int]:
+        """
+        プロファイルの (時刻表ファイル, 徒歩時間, 準備時間) を取得
+
+        Args:
+            profile_name: プロファイル名
+
+        Returns:
+            Tuple[str, int, int]: プロファイル設定
+        """
+        profile = self.profiles.get(profile_name)
+        if profile is None:
+            profile_data = self.store.load_profile(profile_name)
+            profile = (
+                profile_data['schedule_file'],
+                int(profile_data.get('walking_time_minutes', self.defaults[0])),
+                int(profile_data.get('preparation_minutes', self.defaults[1]))
+            )
+            self.profiles[profile_name] = profile
+        return profile
+
+    def evaluate(self, row: dict) -> dict:
+        """
+        1行分の次の列車情報を計算
+
+        Args:
+            row: profile と timestamp（ISO形式、時差付きの場合はローカル時刻に変換）を持つ入力行
+
+        Returns:
+            dict: OUTPUT_FIELDS の各項目を持つ結果
+        """
+        result = dict.fromkeys(OUTPUT_FIELDS, '')
+        if not isinstance(row, dict):
+            result['error'] = f'入力行がオブジェクトではありません: {row!r}'
+            return result
+        result['profile'] = row.get('profile', '')
+        result['timestamp'] = row.get('timestamp', '')
+        if row.get(INVALID_ROW_KEY):
+            result['error'] = row[INVALID_ROW_KEY]
+            return result
+        try:
+            current_time = datetime.fromisoformat(result['timestamp'])
+            if current_time.tzinfo is not None:
+                # 時差付きの時刻はサーバーのローカル時刻に変換する（時刻表はローカル時刻のため）
+                current_time = current_time.astimezone().replace(tzinfo=None)
+            schedule_file, walking_time, preparation_time = self.get_profile(result['profile'])
+            info = self.repository.get_index(schedule_file, current_time).find_next_train(current_time, walking_time, preparation_time)
+        except Exception as e:
+            result['error'] = str(e)
+            return result
+
+        result.update({
+            'current_time': info.current_time,
+            'departure_time': info.departure_time,
+            'arrival_time': info.arrival_time,
+            'time_until_departure': info.time_until_departure
+        })
+        if info.train:
+            result.update({
+                'line': info.train.line,
+                'destination': info.train.destination,
+                'train_departure_time': info.train.departure_time,
+                'train_arrival_time': info.train.arrival_time
+            })
+        return result
+
+
+_worker_evaluator: Optional[BatchEvaluator] = None
+
+
+def init_worker(data_dir: str, defaults: Tuple[int, int]) -> None:
+    """ワーカープロセスごとに一括計算クラスを作成"""
+    global _worker_evaluator
+    _worker_evaluator = BatchEvaluator(data_dir, defaults)
+
+
+def evaluate_group(rows: List[Tuple[int, dict]]) -> List[Tuple[int, dict]]:
+    """
+    同一プロファイルの行をまとめて計算（ワーカープロセス上で実行）
+
+    Args:
+        rows: (行番号, 入力行) の一覧
+
+    Returns:
+        List[Tuple[int, dict]]: (行番号, 結果) の一覧
+    """
+    return [(position, _worker_evaluator.evaluate(row)) for position, row in rows]
+
+
+def read_rows(stream, input_format: str) -> Iterator[dict]:
+    """
+    入力を1行ずつ読み込む
+
+    Args:
+        stream: 入力ストリーム
+        input_format: csv または jsonl
+
+    Yields:
+        dict: 入力行（読み込めない行は INVALID_ROW_KEY にエラー内容を持つ）
+    """
+    if input_format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield {INVALID_ROW_KEY: f'{line_number}行目のJSONが不正です: {e}'}
+            continue
+        if not isinstance(row, dict):
+            yield {INVALID_ROW_KEY: f'{line_number}行目がJSONオブジェクトではありません'}
+            continue
+        yield row
+
+
+class RowWriter:
+    """結果をCSVまたはJSON Linesで書き出すクラス"""
+
+    def __init__(self, stream, output_format: str):
+        """
+        コンストラクタ
+
+        Args:
+            stream: 出力ストリーム
+            output_format: csv または jsonl
+        """
+        self.stream = stream
+        self.csv_writer = None
+        if output_format == 'csv':
+            self.csv_writer = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS, lineterminator='\n')
+            self.csv_writer.writeheader()
+
+    def write(self, result: dict) -> None:
+        """結果を1行書き出す"""
+        if self.csv_writer is not None:
+            self.csv_writer.writerow(result)
+        else:
+            self.stream.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+
+def run_batch(rows: Iterator[dict], writer: RowWriter, data_dir: str, defaults: Tuple[int, int],
+              workers: int = 0, chunk_size: int = 10000) -> int:
+    """
+    一括計算を実行
+
+    workers が1以上の場合は、chunk_size 行ごとにプロファイル単位でまとめてプロセスプールに分配し、
+    出力は入力と同じ順序で書き出します。処理中のチャンク数は workers * 2 に制限します
+
+    Args:
+        rows: 入力行
+        writer: 出力先
+        data_dir: データディレクトリのパス
+        defaults: (徒歩時間, 準備時間) のデフォルト値
+        workers: ワーカープロセス数（0の場合は同一プロセスで実行）
+        chunk_size: 1度に読み込む行数
+
+    Returns:
+        int: 処理した行数
+    """
+    count = 0
+    if workers <= 0:
+        evaluator = BatchEvaluator(data_dir, defaults)
+        for row in rows:
+            writer.write(evaluator.evaluate(row))
+            count += 1
+        return count
+
+    def flush_chunk(chunk_futures) -> None:
+        """チャンクの結果を入力順に書き出す"""
+        results = sorted(result for future in chunk_futures for result in future.result())
+        for _, result in results:
+            writer.write(result)
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(data_dir, defaults)) as pool:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            groups = defaultdict(list)
+            for row in chunk:
+                groups[str(row.get('profile', ''))].append((count, row))
+                count += 1
+            pending.append([pool.submit(evaluate_group, group) for group in groups.values()])
+            if len(pending) >= workers * 2:
+                flush_chunk(pending.popleft())
+        while pending:
+            flush_chunk(pending.popleft())
+    return count
+
+
+def detect_format(path: str, default: str = 'csv') -> str:
+    """ファイル拡張子から形式を判定"""
+    if path.endswith('.jsonl') or path.endswith('.ndjson'):
+        return 'jsonl'
+    if path.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    コマンドラインから実行
+
+    Returns:
+        int: 終了コード
+    """
+    parser = argparse.ArgumentParser(description='次の列車の一括計算ツール')
+    parser.add_argument('input', help='入力ファイル（profile, timestamp 列を含む。- で標準入力）')
+    parser.add_argument('-o', '--output', default='-', help='出力ファイル（省略時は標準出力）')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default=None, help='入力形式（省略時は拡張子から判定）')
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], default=None, help='出力形式（省略時は入力と同じ）')
+    parser.add_argument('--workers', type=int, default=0, help='ワーカープロセス数（0は同一プロセス）')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='1度に読み込む行数')
+    parser.add_argument('--data-dir', default=os.path.dirname(Config.TRAIN_SCHEDULE_PATH), help='データディレクトリ')
+    args = parser.parse_args(argv)
+
+    input_format = args.format or detect_format(args.input)
+    output_format = args.output_format or (input_format if args.output == '-' else detect_format(args.output, input_format))
+    defaults = (Config.HOME_TO_STATION_MINUTES, Config.PREPARATION_MINUTES)
+
+    input_stream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8', newline='')
+    output_stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        count = run_batch(
+            read_rows(input_stream, input_format), RowWriter(output_stream, output_format),
+            args.data_dir, defaults, workers=args.workers, chunk_size=args.chunk_size
+        )
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    print(f'{count}行を処理しました', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
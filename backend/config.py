@@ -11,7 +11,8 @@ class Config:
     
     # Flask設定
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
-    DEBUG = True
+    # 本番環境（systemdで FLASK_ENV=production）ではリローダーによる二重起動を避ける
+    DEBUG = os.environ.get('FLASK_ENV') != 'production'
     
     # CORS設定
     CORS_ORIGINS = ['http://localhost:3000', 'http://localhost:5173']
@@ -27,3 +28,23 @@ class Config:
     
     # 更新間隔
     UPDATE_INTERVAL_SECONDS = 60  # 1分間隔で更新
+    
+    # 起動設定
+    WARMUP_ON_STARTUP = True            # 起動時に全プロファイル・時刻表を読み込んでから準備完了にする
+    
+    # 出発アラート設定
+    ALERTS_ENABLED = True
+    ALERT_LEAD_MINUTES = (5, 1)         # 出発何分前に通知するか
+    ALERT_REFRESH_SECONDS = 60          # プロファイル更新の確認間隔（秒）
+    ALERT_WEBHOOK_TIMEOUT_SECONDS = 3   # Webhook送信のタイムアウト（秒）
+    ALERT_STREAM_QUEUE_SIZE = 100       # ストリーム購読者ごとの最大滞留件数
+    
+    # ログ設定
+    LOGGING_ENABLED = True
+    LOG_DIR = os.path.join(os.path.dirname(__file__), 'logs')
+    LOG_FILE_MAX_BYTES = 1024 * 1024   # ローテーションするファイルサイズ（バイト）
+    LOG_FILE_BACKUP_COUNT = 5          # 保持する過去ログファイル数
+    LOG_BATCH_SIZE = 50                # まとめて書き込む件数
+    LOG_FLUSH_INTERVAL_SECONDS = 5     # 書き込み間隔の上限（秒）
+    LOG_RING_BUFFER_SIZE = 500         # メモリ上に保持する直近ログ件数
+    LOG_API_ENABLED = os.environ.get('LOG_API_ENABLED') == 'true'  # /api/logs を公開するか（デフォルト無効）
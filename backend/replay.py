@@ -0,0 +1,281 @@
+"""
+トラフィックリプレイハーネス
+
+記録済みのアクセスログ（backend/logs/app.log）または合成したリクエスト列を、
+時計を差し替えたアプリケーションに対してN倍速で再生し、
+スループット・レイテンシ・計算結果の不一致を集計します
+
+使用例:
+    python replay.py --log logs/app.log --speed 60
+    python replay.py --synthetic --start 2026-10-19T00:00 --days 2 --interval 1
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from config import Config
+from app import create_app
+from app.clock import FixedClock, set_clock
+from app.models import TrainSchedule
+from app.services.profileStore import ProfileStore
+from app.services.timeCalculator import TimeCalculator
+
+NEXT_TRAIN_PATH = re.compile(r'^/api/profile/(?P<profile>[^/]+)/next-train$')
+
+# 再生対象のパス（プッシュストリームなど応答が終わらないエンドポイントは含めない）
+REPLAY_PATH = re.compile(r'^/api/(profile/[^/]+/[^/]+|profiles|health(/ready)?)$')
+
+
+class ReplayConfig(Config):
+    """リプレイ用設定（ログ出力・アラートを無効化）"""
+    TESTING = True
+    DEBUG = False
+    LOGGING_ENABLED = False
+    ALERTS_ENABLED = False
+
+
+def read_access_log(paths: List[str]) -> Iterator[Tuple[datetime, str]]:
+    """
+    アクセスログからGETリクエストを読み出す
+
+    再生対象は REPLAY_PATH に一致するパスのみです
+
+    Args:
+        paths: JSON Lines形式のログファイル一覧
+
+    Yields:
+        Tuple[datetime, str]: (リクエスト時刻, クエリ付きパス)
+    """
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('kind', 'access') != 'access' or entry.get('method', 'GET') != 'GET':
+                    continue
+                if 'timestamp' not in entry or not REPLAY_PATH.match(entry.get('path', '')):
+                    continue
+                query = entry.get('query')
+                yield datetime.fromisoformat(entry['timestamp']), entry['path'] + (f'?{query}' if query else '')
+
+
+def generate_requests(profiles: List[str], start: datetime, days: int, interval_minutes: int) -> Iterator[Tuple[datetime, str]]:
+    """
+    合成リクエスト列を生成
+
+    各プロファイルについて一定間隔で次の列車情報を問い合わせます
+
+    Args:
+        profiles: プロファイル名一覧
+        start: 開始時刻
+        days: シミュレーション日数
+        interval_minutes: 問い合わせ間隔（分）
+
+    Yields:
+        Tuple[datetime, str]: (リクエスト時刻, パス)
+    """
+    current_time = start
+    end = start + timedelta(days=days)
+    while current_time < end:
+        for profile_name in profiles:
+            yield current_time, f'/api/profile/{profile_name}/next-train'
+        current_time += timedelta(minutes=interval_minutes)
+
+
+def parse_overrides(query: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    クエリ文字列から徒歩時間・準備時間の上書き値を取得
+
+    Args:
+        query: クエリ文字列（walk / prep）
+
+    Returns:
+        Tuple[Optional[int], Optional[int]]: (徒歩時間, 準備時間)（指定がない・不正な場合はNone）
+    """
+    params = parse_qs(query, keep_blank_values=True)
+    overrides = []
+    for name in ('walk', 'prep'):
+        value = params.get(name, [''])[0]
+        overrides.append(int(value) if value.isdecimal() else None)
+    return tuple(overrides)
+
+
+def expected_next_train(store: ProfileStore, profile_name: str, current_time: datetime, defaults: Tuple[int, int],
+                        overrides: Tuple[Optional[int], Optional[int]] = (None, None)) -> dict:
+    """
+    時刻表から直接計算した期待値を取得（正解データ）
+
+    Args:
+        store: プロファイルストア
+        profile_name: プロファイル名
+        current_time: リクエスト時刻
+        defaults: (徒歩時間, 準備時間) のデフォルト値
+        overrides: クエリで指定された (徒歩時間, 準備時間)（Noneの項目はプロファイルの値を使う）
+
+    Returns:
+        dict: 次の列車情報
+    """
+    profile_data = store.load_profile(profile_name)
+    train_schedule = TrainSchedule.from_dict(store.load_schedule(profile_data['schedule_file']), current_time)
+    walking_time, preparation_time = overrides
+    calculator = TimeCalculator(
+        walking_time if walking_time is not None else int(profile_data.get('walking_time_minutes', defaults[0])),
+        preparation_time if preparation_time is not None else int(profile_data.get('preparation_minutes', defaults[1]))
+    )
+    info = calculator.find_next_train(train_schedule, current_time)
+    return {
+        'current_time': info.current_time,
+        'departure_time': info.departure_time,
+        'arrival_time': info.arrival_time,
+        'time_until_departure': info.time_until_departure,
+        'train': asdict(info.train) if info.train else None
+    }
+
+
+def percentile(sorted_values: List[float], ratio: float) -> Optional[float]:
+    """ソート済みリストからパーセンタイル値を取得"""
+    if not sorted_values:
+        return None
+    index = min(int(len(sorted_values) * ratio), len(sorted_values) - 1)
+    return round(sorted_values[index], 3)
+
+
+def summarize(latencies: List[float]) -> dict:
+    """レイテンシ（ミリ秒）の集計値を作成"""
+    values = sorted(latencies)
+    return {
+        'requests': len(values),
+        'p50_ms': percentile(values, 0.50),
+        'p95_ms': percentile(values, 0.95),
+        'p99_ms': percentile(values, 0.99),
+        'max_ms': round(values[-1], 3) if values else None
+    }
+
+
+def replay(requests: Iterator[Tuple[datetime, str]], speed: float = 0, max_examples: int = 10) -> dict:
+    """
+    リクエスト列を再生して結果を集計
+
+    Args:
+        requests: (リクエスト時刻, パス) の列（時刻順）
+        speed: 再生速度の倍率（0の場合は待たずに最大速度で再生）
+        max_examples: レポートに含める不一致例の最大数
+
+    Returns:
+        dict: 集計レポート
+    """
+    clock = FixedClock(datetime.now())
+    app = create_app(ReplayConfig, clock=clock)
+    client = app.test_client()
+    store = app.extensions['profile_store']
+    defaults = (app.config['HOME_TO_STATION_MINUTES'], app.config['PREPARATION_MINUTES'])
+
+    latencies = []
+    daily = defaultdict(list)
+    daily_mismatches = defaultdict(int)
+    statuses = defaultdict(int)
+    mismatches = []
+    mismatch_count = 0
+    first_time = last_time = None
+    wall_start = time.perf_counter()
+
+    try:
+        for request_time, path in requests:
+            if first_time is None:
+                first_time = request_time
+            last_time = request_time
+
+            # 再生速度に合わせて待機
+            if speed > 0:
+                target = wall_start + (request_time - first_time).total_seconds() / speed
+                delay = target - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            clock.set(request_time)
+            started = time.perf_counter()
+            response = client.get(path)
+            latency_ms = (time.perf_counter() - started) * 1000
+
+            latencies.append(latency_ms)
+            daily[request_time.date().isoformat()].append(latency_ms)
+            statuses[response.status_code] += 1
+
+            # 次の列車情報は時刻表から直接計算した値と照合
+            url = urlsplit(path)
+            match = NEXT_TRAIN_PATH.match(url.path)
+            if match and response.status_code == 200:
+                actual = response.get_json()
+                expected = expected_next_train(
+                    store, match.group('profile'), request_time, defaults, parse_overrides(url.query)
+                )
+                if any(actual.get(key) != value for key, value in expected.items()):
+                    mismatch_count += 1
+                    daily_mismatches[request_time.date().isoformat()] += 1
+                    if len(mismatches) < max_examples:
+                        mismatches.append({'time': request_time.isoformat(), 'path': path, 'expected': expected, 'actual': actual})
+    finally:
+        # システム時刻に戻す
+        set_clock(None)
+
+    wall_seconds = time.perf_counter() - wall_start
+    return {
+        'wall_seconds': round(wall_seconds, 3),
+        'throughput_rps': round(len(latencies) / wall_seconds, 1) if wall_seconds > 0 else None,
+        'simulated_start': first_time.isoformat() if first_time else None,
+        'simulated_end': last_time.isoformat() if last_time else None,
+        'speed': speed,
+        'latency': summarize(latencies),
+        'status_counts': dict(statuses),
+        'mismatches': mismatch_count,
+        'mismatch_examples': mismatches,
+        'days': {
+            day: {**summarize(values), 'mismatches': daily_mismatches[day]}
+            for day, values in sorted(daily.items())
+        }
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    コマンドラインから実行
+
+    Returns:
+        int: 不一致があった場合は1
+    """
+    parser = argparse.ArgumentParser(description='トラフィックリプレイハーネス')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--log', nargs='+', help='再生するアクセスログ（JSON Lines）')
+    source.add_argument('--synthetic', action='store_true', help='合成リクエストを再生する')
+    parser.add_argument('--start', type=datetime.fromisoformat, default=None, help='合成リクエストの開始時刻（ISO形式、省略時は当日0時）')
+    parser.add_argument('--days', type=int, default=1, help='合成リクエストの日数')
+    parser.add_argument('--interval', type=int, default=1, help='合成リクエストの間隔（分）')
+    parser.add_argument('--profiles', default=None, help='合成リクエストのプロファイル（カンマ区切り、省略時は全て）')
+    parser.add_argument('--speed', type=float, default=0, help='再生速度の倍率（0は最大速度）')
+    args = parser.parse_args(argv)
+
+    if args.log:
+        requests = read_access_log(args.log)
+    else:
+        start = args.start or datetime.combine(datetime.now().date(), datetime.min.time())
+        data_dir = os.path.dirname(Config.TRAIN_SCHEDULE_PATH)
+        profiles = args.profiles.split(',') if args.profiles else ProfileStore(data_dir).list_profile_names()
+        requests = generate_requests(profiles, start, args.days, args.interval)
+
+    report = replay(requests, speed=args.speed)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if report['mismatches'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
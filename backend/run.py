@@ -13,11 +13,13 @@ if __name__ == '__main__':
     print("  - GET /api/next-train : 次の列車情報")
     print("  - GET /api/trains : 全ての列車情報")
     print("  - GET /api/config : アプリケーション設定")
-    print("  - GET /api/health : ヘルスチェック")
+    print("  - GET /api/health : ヘルスチェック（alive / ready）")
+    print("  - GET /api/health/ready : 準備完了確認（準備中は503）")
+    print("  - GET /api/startup : 起動時間レポート")
     print()
     
     app.run(
         host='0.0.0.0',  # Raspberry Pi上でLAN内からアクセス可能にする
         port=5000,
-        debug=True
+        debug=app.debug
     )
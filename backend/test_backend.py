@@ -14,6 +14,16 @@ from datetime import datetime, time, timedelta
 from app.models import Train, TrainSchedule
 from app.services.timeCalculator import TimeCalculator
 from app.services.trainScheduler import TrainScheduler
+from app.services.departureTable import build_departure_table
+from app.services.requestLogger import RingBufferHandler, StructuredQueueHandler
+from app.services.alertHeap import AlertHeap
+from app.services.alertDelivery import AlertDelivery
+from app.services.alertScheduler import build_alert_plan
+from app.clock import FixedClock, set_clock
+from app.services.scheduleIndex import ScheduleIndex
+from app.services.startupReport import StartupReport
+from app.services.profileStore import ProfileStore
+from app.services.scheduleRepository import ScheduleRepository
 
 def test_models():
     """モデルクラスのテスト"""
@@ -162,6 +172,365 @@ def test_train_scheduler():
     
     print()
 
+def test_departure_table():
+    """出発時刻表（差分エンコード）のテスト"""
+    print("=== 出発時刻表テスト ===")
+    
+    schedule_path = os.path.join(os.path.dirname(__file__), 'data', 'schedule', 'train_schedule_kitakoku.json')
+    with open(schedule_path, 'r', encoding='utf-8') as f:
+        schedule_data = json.load(f)
+    
+    scheduler = TrainScheduler(schedule_data=schedule_data, home_to_station_minutes=13, preparation_minutes=3)
+    today = datetime.today()
+    table = build_departure_table(scheduler.train_schedule, scheduler.time_calculator, today.date())
+    print(f"列車数: {len(table['leave_deltas'])} 路線数: {len(table['lines'])} 版数: {table['version']}")
+    
+    # 差分をデコードして自宅出発時刻を復元
+    leave_minutes = []
+    leave = 0
+    for delta in table['leave_deltas']:
+        leave += delta
+        leave_minutes.append(leave)
+    
+    # クライアント側の計算結果が find_next_train と一致することを確認
+    for hour, minute, second in [(5, 0, 0), (7, 30, 15), (12, 1, 59), (23, 59, 0)]:
+        current_time = today.replace(hour=hour, minute=minute, second=second, microsecond=0)
+        expected = scheduler.get_next_train_info(current_time)
+        now_seconds = hour * 3600 + minute * 60 + second
+        index = next((i for i, m in enumerate(leave_minutes) if m * 60 > now_seconds), None)
+        if index is None:
+            assert expected.train is None
+            continue
+        assert f"{leave_minutes[index] // 60:02d}:{leave_minutes[index] % 60:02d}" == expected.departure_time
+        assert table['lines'][table['line_index'][index]] == expected.train.line
+        assert table['destinations'][table['destination_index'][index]] == expected.train.destination
+        assert int((leave_minutes[index] * 60 - now_seconds) / 60) == expected.time_until_departure
+    
+    assert table['expires_at'].startswith((today.date() + timedelta(days=1)).isoformat())
+    print()
+
+def test_log_ring_buffer():
+    """ログのリングバッファのテスト"""
+    print("=== ログリングバッファテスト ===")
+    
+    import logging
+    import queue
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    ring_buffer = RingBufferHandler(size=3)
+    
+    # キューに積んだレコードをリングバッファへ渡す
+    for name, level, message in [
+        ('whattimenexttrain.access', logging.INFO, 'GET /api/health 200'),
+        ('whattimenexttrain.error', logging.ERROR, '読み込み失敗'),
+        ('whattimenexttrain.access', logging.INFO, 'GET /api/profiles 200'),
+        ('whattimenexttrain.access', logging.INFO, 'GET /api/logs 200'),
+    ]:
+        record = logging.LogRecord(name, level, __file__, 0, message, None, None)
+        queue_handler.handle(record)
+        ring_buffer.handle(log_queue.get_nowait())
+    
+    entries = ring_buffer.get_entries()
+    print(f"保持件数: {len(entries)}")
+    assert [entry['message'] for entry in entries] == ['GET /api/logs 200', 'GET /api/profiles 200', '読み込み失敗']
+    assert [entry['kind'] for entry in ring_buffer.get_entries(level='ERROR')] == ['error']
+    assert len(ring_buffer.get_entries(limit=1, kind='access')) == 1
+    try:
+        ring_buffer.get_entries(limit=0)
+        assert False, 'limit=0 は拒否されるべき'
+    except ValueError:
+        pass
+    print()
+
+def test_alert_heap():
+    """出発アラートの共有タイマーヒープのテスト"""
+    print("=== アラートヒープテスト ===")
+    
+    base = datetime.today().replace(hour=12, minute=0, second=0, microsecond=0)
+    schedule_data = {
+        'depature': 'テスト駅',
+        'schedules': [
+            {'type': 'weekday', 'trains': [
+                {'line': 'A線', 'destination': 'X', 'departure_time': '12:20', 'arrival_time': '12:50'},
+                {'line': 'A線', 'destination': 'Y', 'departure_time': '12:40', 'arrival_time': '13:10'}
+            ]},
+            {'type': 'weekend', 'trains': [
+                {'line': 'A線', 'destination': 'X', 'departure_time': '12:20', 'arrival_time': '12:50'},
+                {'line': 'A線', 'destination': 'Y', 'departure_time': '12:40', 'arrival_time': '13:10'}
+            ]}
+        ]
+    }
+    
+    # 徒歩10分・準備5分 → 自宅出発 12:05 / 12:25、5分前と1分前に通知
+    index = ScheduleIndex(TrainSchedule.from_dict(schedule_data, base))
+    plan = build_alert_plan('test', {'walking_time_minutes': '10', 'preparation_minutes': '5'},
+                            index, (5, 1), (10, 3), base)
+    print(f"通知予定: {[alert['fire_at'].strftime('%H:%M') for alert in plan]}")
+    assert [alert['fire_at'].strftime('%H:%M') for alert in plan] == ['12:04', '12:20', '12:24']
+    
+    heap = AlertHeap()
+    heap.set_plan('test', plan)
+    heap.set_plan('other', [{'fire_at': base + timedelta(minutes=10), 'profile_name': 'other'}])
+    assert len(heap.heap) == 2  # プロファイルごとに直近1件のみ
+    assert heap.next_fire_time() == base + timedelta(minutes=4)
+    
+    due = heap.pop_due(base + timedelta(minutes=10))
+    assert [alert['fire_at'] for alert in due] == [base + timedelta(minutes=4), base + timedelta(minutes=10)]
+    
+    # 予定の置き換え後は古い通知が発火しない
+    heap.set_plan('test', [])
+    assert heap.next_fire_time() is None
+    assert heap.pop_due(base + timedelta(hours=1)) == []
+    
+    # Webhookの通知対象は文字列の配列のみ受け付ける
+    delivery = AlertDelivery()
+    for profiles in ('test', 1, ['test', 2]):
+        try:
+            delivery.register_webhook('http://127.0.0.1:9000/hook', profiles)
+            assert False, f'profiles={profiles!r} は拒否されるべき'
+        except ValueError:
+            pass
+    delivery.register_webhook('http://127.0.0.1:9000/hook', ['test'])
+    assert delivery.list_webhooks() == [{'url': 'http://127.0.0.1:9000/hook', 'profiles': ['test']}]
+    
+    from config import Config
+    from app import create_app
+    
+    class TestConfig(Config):
+        TESTING = True
+        LOGGING_ENABLED = False
+        ALERTS_ENABLED = False
+    
+    client = create_app(TestConfig).test_client()
+    assert client.post('/api/alerts/webhooks', json=[1]).status_code == 400
+    assert client.delete('/api/alerts/webhooks', json=[1]).status_code == 400
+    assert client.delete('/api/alerts/webhooks?url=http://127.0.0.1:9000/none').status_code == 404
+    print()
+
+def test_clock_injection():
+    """時計の差し替えとリプレイハーネスのテスト"""
+    print("=== 時計差し替えテスト ===")
+    
+    schedule_data = {
+        'depature': 'テスト駅',
+        'schedules': [
+            {'type': 'weekday', 'trains': [{'line': '平日線', 'destination': 'X', 'departure_time': '8:00', 'arrival_time': '8:30'}]},
+            {'type': 'weekend', 'trains': [{'line': '休日線', 'destination': 'X', 'departure_time': '9:00', 'arrival_time': '9:30'}]}
+        ]
+    }
+    
+    # 2026-10-16は金曜日、2026-10-17は土曜日
+    clock = FixedClock(datetime(2026, 10, 16, 7, 0))
+    set_clock(clock)
+    try:
+        assert TrainSchedule.from_dict(schedule_data).trains[0].line == '平日線'
+        clock.advance(days=1)
+        assert TrainSchedule.from_dict(schedule_data).trains[0].line == '休日線'
+        
+        next_train = TimeCalculator(10, 5).find_next_train(TrainSchedule.from_dict(schedule_data))
+        print(f"土曜07:00の次の列車: {next_train.train.line} 出発まで{next_train.time_until_departure}分")
+        assert next_train.departure_time == '08:45'
+        assert next_train.time_until_departure == 105
+    finally:
+        set_clock(None)
+    
+    # 平日から土休日への日付境界をまたいで再生し、計算結果を照合
+    from replay import generate_requests, read_access_log, replay
+    report = replay(generate_requests(['kitakoku', 'yagiri'], datetime(2026, 10, 16, 22, 0), 1, 15))
+    print(f"リプレイ: {report['latency']['requests']}件 不一致{report['mismatches']}件")
+    assert report['status_counts'] == {200: report['latency']['requests']}
+    assert report['mismatches'] == 0
+    assert list(report['days']) == ['2026-10-16', '2026-10-17']
+    
+    # 徒歩・準備時間を上書きしたリクエストも上書き値で照合する
+    report = replay(
+        (request_time, path + '?walk=15&prep=5')
+        for request_time, path in generate_requests(['kitakoku'], datetime(2026, 10, 16, 6, 0), 1, 30)
+    )
+    assert report['mismatches'] == 0
+    
+    # アクセスログの再生ではプッシュストリームを対象にしない
+    import tempfile
+    with tempfile.NamedTemporaryFile('w', suffix='.log', delete=False, encoding='utf-8') as f:
+        for path in ['/api/profile/kitakoku/next-train', '/api/alerts/stream', '/api/health']:
+            f.write(json.dumps({'kind': 'access', 'method': 'GET', 'timestamp': '2026-10-16T07:00:00', 'path': path}) + '\n')
+    try:
+        requests = list(read_access_log([f.name]))
+    finally:
+        os.remove(f.name)
+    assert [path for _, path in requests] == ['/api/profile/kitakoku/next-train', '/api/health']
+    report = replay(requests)
+    assert report['status_counts'] == {200: 2}
+    assert report['latency']['max_ms'] < 1000
+    print()
+
+def test_schedule_index():
+    """時刻表インデックスと一括計算のテスト"""
+    print("=== 時刻表インデックステスト ===")
+    
+    schedule_path = os.path.join(os.path.dirname(__file__), 'data', 'schedule', 'train_schedule_kitakoku.json')
+    with open(schedule_path, 'r', encoding='utf-8') as f:
+        schedule_data = json.load(f)
+    
+    # 平日・土休日それぞれ、日付をまたぐ大きな所要時間も含めて全時刻で一致することを確認
+    for base in [datetime(2026, 10, 16), datetime(2026, 10, 17)]:
+        train_schedule = TrainSchedule.from_dict(schedule_data, base)
+        index = ScheduleIndex(train_schedule)
+        for walking_time, preparation in [(13, 3), (0, 0), (200, 300)]:
+            calculator = TimeCalculator(walking_time, preparation)
+            for minute in range(0, 24 * 60, 7):
+                current_time = base + timedelta(minutes=minute, seconds=minute % 60)
+                expected = calculator.find_next_train(train_schedule, current_time)
+                assert index.find_next_train(current_time, walking_time, preparation) == expected
+    
+    # CSVを一括計算して find_next_train と同じ結果になることを確認
+    import io
+    from batch import RowWriter, read_rows, run_batch
+    
+    data_dir = os.path.join(os.path.dirname(__file__), 'data')
+    input_stream = io.StringIO(
+        "profile,timestamp\n"
+        "kitakoku,2026-10-16T07:30:10\n"
+        "yagiri,2026-10-17T23:59:00\n"
+        "unknown,2026-10-16T07:30:00\n"
+    )
+    output_stream = io.StringIO()
+    count = run_batch(read_rows(input_stream, 'csv'), RowWriter(output_stream, 'jsonl'), data_dir, (10, 3))
+    results = [json.loads(line) for line in output_stream.getvalue().splitlines()]
+    print(f"一括計算: {count}行")
+    
+    with open(os.path.join(data_dir, 'profile', 'profile_kitakoku.json'), 'r', encoding='utf-8') as f:
+        walking_time = int(json.load(f)['walking_time_minutes'])
+    expected = TimeCalculator(walking_time, 3).find_next_train(
+        TrainSchedule.from_dict(schedule_data, datetime(2026, 10, 16)), datetime(2026, 10, 16, 7, 30, 10)
+    )
+    assert results[0]['departure_time'] == expected.departure_time
+    assert results[0]['time_until_departure'] == expected.time_until_departure
+    assert results[0]['train_departure_time'] == expected.train.departure_time
+    assert results[1]['departure_time'] == '--:--'
+    assert results[2]['error']
+    
+    # 不正な行はその行だけエラーにし、時差付きの時刻はローカル時刻に変換する
+    local_time = datetime(2026, 10, 16, 7, 30, 10)
+    input_stream = io.StringIO(
+        '{"profile": "kitakoku", "timestamp": "%s"}\n'
+        '{"profile": \n'
+        '[1, 2]\n'
+        '{"profile": "kitakoku", "timestamp": "2026-10-16T07:30:10"}\n' % local_time.astimezone().isoformat()
+    )
+    output_stream = io.StringIO()
+    count = run_batch(read_rows(input_stream, 'jsonl'), RowWriter(output_stream, 'jsonl'), data_dir, (10, 3))
+    results = [json.loads(line) for line in output_stream.getvalue().splitlines()]
+    assert count == 4
+    assert [bool(result['error']) for result in results] == [False, True, True, False]
+    assert results[0]['departure_time'] == results[3]['departure_time'] == expected.departure_time
+    print()
+
+def test_startup_report():
+    """起動時間レポートとヘルスチェックのテスト"""
+    print("=== 起動時間レポートテスト ===")
+    
+    import time as time_module
+    
+    report = StartupReport()
+    with report.phase('imports'):
+        pass
+    assert not report.ready
+    assert report.to_dict()['boot_to_ready_ms'] is None
+    report.mark_ready()
+    assert report.ready
+    assert 'imports' in report.to_dict()['phases_ms']
+    
+    from config import Config
+    from app import create_app
+    
+    class TestConfig(Config):
+        TESTING = True
+        LOGGING_ENABLED = False
+        ALERTS_ENABLED = False
+    
+    client = create_app(TestConfig).test_client()
+    assert client.get('/api/health').get_json()['alive'] is True
+    
+    # 事前読み込みの完了を待つ
+    for _ in range(50):
+        if client.get('/api/health/ready').status_code == 200:
+            break
+        time_module.sleep(0.1)
+    
+    startup = client.get('/api/startup').get_json()
+    print(f"起動時間: {startup['boot_to_ready_ms']}ms {startup['phases_ms']}")
+    assert startup['ready'] is True
+    assert startup['failed_profiles'] == {}
+    assert {'imports', 'app_factory', 'data_load'} <= set(startup['phases_ms'])
+    print()
+
+def test_shared_schedule():
+    """時刻表インデックスの共有と徒歩・準備時間の上書きのテスト"""
+    print("=== 時刻表共有テスト ===")
+    
+    repository = ScheduleRepository(ProfileStore(os.path.join(os.path.dirname(__file__), 'data')))
+    weekday = datetime(2026, 10, 16, 7, 0)
+    
+    # 同じ時刻表ファイル・同じ曜日区分なら同一インスタンスを返す
+    index = repository.get_index('train_schedule_kitakoku.json', weekday)
+    assert repository.get_index('train_schedule_kitakoku.json', weekday + timedelta(days=-1)) is index
+    assert repository.get_index('train_schedule_kitakoku.json', weekday + timedelta(days=1)) is not index
+    assert repository.warm_up(weekday) == {}
+    print(f"インデックス数: {len(repository.indexes)}")
+    
+    # 読み込めないプロファイルがあっても残りのプロファイルは読み込む
+    import shutil
+    import tempfile
+    data_dir = tempfile.mkdtemp()
+    try:
+        shutil.copytree(os.path.join(os.path.dirname(__file__), 'data'), data_dir, dirs_exist_ok=True)
+        with open(os.path.join(data_dir, 'profile', 'profile_aaa.json'), 'w', encoding='utf-8') as f:
+            json.dump({'depature': '壊れた駅'}, f)
+        broken_repository = ScheduleRepository(ProfileStore(data_dir))
+        failed = broken_repository.warm_up(weekday)
+        assert list(failed) == ['aaa']
+        assert set(broken_repository.indexes) == {key for key in repository.indexes if not key[1]}
+    finally:
+        shutil.rmtree(data_dir)
+    
+    # 徒歩・準備時間は検索時に指定し、TimeCalculator と同じ結果になる
+    for walking_time, preparation in [(13, 3), (15, 5), (0, 0)]:
+        expected = TimeCalculator(walking_time, preparation).find_next_train(index.train_schedule, weekday)
+        assert index.find_next_train(weekday, walking_time, preparation) == expected
+    
+    from config import Config
+    from app import create_app
+    
+    class TestConfig(Config):
+        TESTING = True
+        LOGGING_ENABLED = False
+        ALERTS_ENABLED = False
+    
+    app = create_app(TestConfig, clock=FixedClock(weekday))
+    client = app.test_client()
+    try:
+        default = client.get('/api/profile/kitakoku/next-train').get_json()
+        overridden = client.get('/api/profile/kitakoku/next-train?walk=15&prep=5').get_json()
+        print(f"既定: {default['departure_time']} 上書き: {overridden['departure_time']}")
+        assert (overridden['walking_time_minutes'], overridden['preparation_minutes']) == (15, 5)
+        expected = TimeCalculator(15, 5).find_next_train(index.train_schedule, weekday)
+        assert overridden['departure_time'] == expected.departure_time
+        assert client.get('/api/profile/kitakoku/next-train?walk=abc').status_code == 400
+        # 上書き値の出発時刻表はキャッシュされない
+        app_index = app.extensions['schedule_repository'].get_index('train_schedule_kitakoku.json', weekday)
+        cached_totals = set(app_index.leave_tables)
+        for walk in range(30):
+            assert client.get(f'/api/profile/kitakoku/next-train?walk={walk}&prep=7').status_code == 200
+        assert cached_totals and set(app_index.leave_tables) == cached_totals
+        invalid = client.get('/api/profile/kitakoku/next-train?walk=²')
+        assert invalid.status_code == 400 and 'walk には' in invalid.get_json()['error']
+        assert client.get('/api/profile/kitakoku/timetable?prep=5').get_json()['preparation_minutes'] == 5
+    finally:
+        set_clock(None)
+    print()
+
 if __name__ == "__main__":
     print("WhatTimeNextTrain バックエンドテスト")
     print("=" * 50)
@@ -171,6 +540,13 @@ if __name__ == "__main__":
         test_time_calculator()
         test_arrival_time_calculation()
         test_train_scheduler()
+        test_departure_table()
+        test_log_ring_buffer()
+        test_alert_heap()
+        test_clock_injection()
+        test_schedule_index()
+        test_startup_report()
+        test_shared_schedule()
         print("テスト完了！")
     except Exception as e:
         print(f"テスト中にエラーが発生しました: {e}")
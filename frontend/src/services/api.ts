@@ -10,10 +10,35 @@ import type {
   AllTrainsResponse, 
   HealthResponse,
   ProfilesResponse,
+  TimetableResponse,
+  TravelOverrides,
 } from '../types/api';
 
+// デコード済みの出発時刻表
+interface DecodedTimetable {
+  response: TimetableResponse;
+  leaveMinutes: number[];
+  expiresAt: number;
+}
+
+/**
+ * 0時からの経過分をHH:MM形式に変換
+ */
+const formatMinutes = (minutes: number): string => {
+  const normalized = ((minutes % 1440) + 1440) % 1440;
+  const hour = Math.floor(normalized / 60);
+  const minute = normalized % 60;
+  return `${String(hour).padStart(2, '0')}:${String(minute).padStart(2, '0')}`;
+};
+
+// 時刻表の取得に失敗した後、再取得を控える時間（ミリ秒）
+const TIMETABLE_RETRY_INTERVAL_MS = 60 * 1000;
+
 class ApiService {
   private api: AxiosInstance;
+  private timetables = new Map<string, DecodedTimetable>();
+  private pendingTimetables = new Map<string, Promise<DecodedTimetable>>();
+  private timetableFailedAt = new Map<string, number>();
 
   constructor() {
     // APIベースURLの設定
@@ -58,9 +83,10 @@ class ApiService {
   /**
    * プロファイル指定で次の列車情報を取得
    * 指定されたプロファイルから次に乗車できる列車の情報を取得します
+   * overrides で徒歩時間・準備時間を上書きできます
    */
-  async getNextTrainByProfile(profileName: string): Promise<NextTrainResponse> {
-    const response = await this.api.get<NextTrainResponse>(`/profile/${profileName}/next-train`);
+  async getNextTrainByProfile(profileName: string, overrides: TravelOverrides = {}): Promise<NextTrainResponse> {
+    const response = await this.api.get<NextTrainResponse>(`/profile/${profileName}/next-train`, { params: overrides });
     return response.data;
   }
 
@@ -72,6 +98,124 @@ class ApiService {
     const response = await this.api.get<AllTrainsResponse>(`/profile/${profileName}/trains`);
     return response.data;
   }
+
+  /**
+   * プロファイル指定で出発時刻表を取得
+   * 運行日1日分の自宅出発時刻を差分エンコード形式で取得します
+   * overrides で徒歩時間・準備時間を上書きできます
+   */
+  async getTimetableByProfile(profileName: string, overrides: TravelOverrides = {}): Promise<TimetableResponse> {
+    const response = await this.api.get<TimetableResponse>(`/profile/${profileName}/timetable`, { params: overrides });
+    return response.data;
+  }
+
+  /**
+   * 出発時刻表をキャッシュから取得（失効していればサーバーから取得）
+   * 同じ時刻表の取得中は同じ Promise を共有し、失敗後は一定時間再取得しません。
+   * 再取得できない間は失効済みでもキャッシュ済みの時刻表を使い続けます
+   */
+  private async loadTimetable(
+    cacheKey: string,
+    profileName: string,
+    now: Date,
+    overrides: TravelOverrides,
+  ): Promise<DecodedTimetable> {
+    const cached = this.timetables.get(cacheKey);
+    if (cached && now.getTime() < cached.expiresAt) {
+      return cached;
+    }
+
+    let pending = this.pendingTimetables.get(cacheKey);
+    if (!pending) {
+      const failedAt = this.timetableFailedAt.get(cacheKey);
+      if (failedAt !== undefined && Date.now() - failedAt < TIMETABLE_RETRY_INTERVAL_MS) {
+        if (cached) return cached;
+        throw new Error('時刻表の取得に失敗したため、再取得を待機しています');
+      }
+
+      pending = this.getTimetableByProfile(profileName, overrides)
+        .then((response) => {
+          let leave = 0;
+          const leaveMinutes = response.leave_deltas.map((delta) => (leave += delta));
+          const timetable = {
+            response,
+            leaveMinutes,
+            expiresAt: new Date(response.expires_at).getTime(),
+          };
+          this.timetables.set(cacheKey, timetable);
+          this.timetableFailedAt.delete(cacheKey);
+          return timetable;
+        })
+        .catch((error) => {
+          this.timetableFailedAt.set(cacheKey, Date.now());
+          throw error;
+        })
+        .finally(() => {
+          this.pendingTimetables.delete(cacheKey);
+        });
+      this.pendingTimetables.set(cacheKey, pending);
+    }
+
+    try {
+      return await pending;
+    } catch (error) {
+      if (cached) return cached;
+      throw error;
+    }
+  }
+
+  /**
+   * 出発時刻表から次の列車情報をローカルで計算
+   * 時刻表は失効時刻（日付境界）まで保持し、それまでサーバーへ問い合わせません
+   */
+  async getNextTrainLocally(
+    profileName: string,
+    now: Date = new Date(),
+    overrides: TravelOverrides = {},
+  ): Promise<NextTrainResponse> {
+    const cacheKey = `${profileName}:${overrides.walk ?? ''}:${overrides.prep ?? ''}`;
+    const timetable = await this.loadTimetable(cacheKey, profileName, now, overrides);
+
+    const table = timetable.response;
+    const currentTime = formatMinutes(now.getHours() * 60 + now.getMinutes());
+    const nowSeconds = now.getHours() * 3600 + now.getMinutes() * 60 + now.getSeconds() + now.getMilliseconds() / 1000;
+    const requiredMinutes = table.walking_time_minutes + table.preparation_minutes;
+
+    // バックエンドの TimeCalculator.find_next_train と同じ判定
+    const index = timetable.leaveMinutes.findIndex((minutes) => minutes * 60 > nowSeconds);
+    if (index < 0) {
+      return {
+        current_time: currentTime,
+        departure_time: '--:--',
+        departure_station: table.departure_station,
+        arrival_time: '--:--',
+        time_until_departure: 0,
+        walking_time_minutes: table.walking_time_minutes,
+        preparation_minutes: table.preparation_minutes,
+        station_name: table.departure_station,
+        train: null,
+      };
+    }
+
+    const leaveMinutes = timetable.leaveMinutes[index];
+    const trainDeparture = leaveMinutes + requiredMinutes;
+    return {
+      current_time: currentTime,
+      departure_time: formatMinutes(leaveMinutes),
+      departure_station: table.departure_station,
+      arrival_time: formatMinutes(leaveMinutes + table.walking_time_minutes),
+      time_until_departure: Math.trunc((leaveMinutes * 60 - nowSeconds) / 60),
+      walking_time_minutes: table.walking_time_minutes,
+      preparation_minutes: table.preparation_minutes,
+      station_name: table.departure_station,
+      train: {
+        line: table.lines[table.line_index[index]],
+        destination: table.destinations[table.destination_index[index]],
+        departure_time: formatMinutes(trainDeparture),
+        arrival_time: formatMinutes(trainDeparture + table.ride_minutes[index]),
+      },
+    };
+  }
 }
 
 // シングルトンインスタンスを作成
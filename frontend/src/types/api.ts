@@ -19,6 +19,8 @@ export interface NextTrainResponse {
   departure_station: string;
   arrival_time: string;
   time_until_departure: number;
+  walking_time_minutes?: number;
+  preparation_minutes?: number;
   station_name: string;
   train: Train | null;
   error?: string;
@@ -31,9 +33,35 @@ export interface AllTrainsResponse {
   error?: string;
 }
 
+// 徒歩時間・準備時間の上書き値（分）
+export interface TravelOverrides {
+  walk?: number;
+  prep?: number;
+}
+
+// 出発時刻表APIレスポンスの型（差分エンコード形式）
+export interface TimetableResponse {
+  profile_name: string;
+  departure_station: string;
+  service_date: string;
+  version: string;
+  expires_at: string;
+  walking_time_minutes: number;
+  preparation_minutes: number;
+  lines: string[];
+  destinations: string[];
+  leave_deltas: number[];
+  line_index: number[];
+  destination_index: number[];
+  ride_minutes: number[];
+  error?: string;
+}
+
 // ヘルスチェックAPIレスポンスの型
 export interface HealthResponse {
   status: string;
+  alive: boolean;
+  ready: boolean;
   timestamp: string;
 }
 
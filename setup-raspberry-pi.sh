@@ -123,8 +123,8 @@ if [[ $REPLY =~ ^[Yy]$ ]]; then
     sudo tee /etc/systemd/system/whattimenexttrain-backend.service > /dev/null <<EOF
 [Unit]
 Description=WhatTimeNextTrain Backend API Server
-After=network.target
-Wants=network.target
+After=network-online.target
+Wants=network-online.target
 
 [Service]
 Type=simple
@@ -133,7 +133,6 @@ Group=$CURRENT_USER
 WorkingDirectory=$PROJECT_DIR/backend
 Environment=PYTHONPATH=$PROJECT_DIR/backend
 Environment=FLASK_ENV=production
-ExecStartPre=/bin/sleep 10
 ExecStart=$PROJECT_DIR/backend/venv/bin/python run.py
 Restart=always
 RestartSec=10
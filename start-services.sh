@@ -236,7 +236,7 @@ start_backend() {
     print_info "⏳ バックエンドサーバーの起動を待機中..."
     for i in {1..30}; do
         sleep 1
-        if curl -s http://localhost:5000/api/health > /dev/null 2>&1; then
+        if curl -sf http://localhost:5000/api/health/ready > /dev/null 2>&1; then
             print_success "✅ バックエンドサーバーが起動しました (http://localhost:5000)"
             return 0
         fi